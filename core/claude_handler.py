@@ -56,6 +56,7 @@ class SessionConfig:
 class SessionHistory:
     """Histórico de uma sessão de chat."""
     messages: List[Dict[str, Any]] = field(default_factory=list)
+    message_count: int = 0  # Mantido a cada envio, evita len(messages)
     total_tokens: int = 0
     total_cost: float = 0.0
 
@@ -317,6 +318,11 @@ class ClaudeHandler:
                 client.query(enriched_message, session_id=session_id),
                 timeout=timeout
             )
+
+            # Contadores de mensagens mantidos no envio
+            if session_id in self.session_histories:
+                self.session_histories[session_id].message_count += 1
+            self.session_manager.record_message(session_id)
             
             # Define real_session_id no início do processamento
             real_session_id = session_id
@@ -437,8 +443,7 @@ class ClaudeHandler:
                                 # Atualiza métricas no session manager
                                 self.session_manager.update_session_metrics(
                                     session_id, 
-                                    total_tokens=history.total_tokens,
-                                    message_count=len(history.messages) + 1
+                                    total_tokens=history.total_tokens
                                 )
                             
                     if hasattr(msg, 'total_cost_usd') and msg.total_cost_usd:
@@ -530,7 +535,7 @@ class ClaudeHandler:
                 "created_at": config.created_at.isoformat()
             },
             "history": {
-                "message_count": len(history.messages),
+                "message_count": history.message_count,
                 "total_tokens": history.total_tokens,
                 "total_cost": history.total_cost
             }
@@ -773,4 +778,8 @@ class ClaudeHandler:
         self.logger.info(
             f"Pool de conexões encerrado - {pool_size} conexões fechadas",
             extra={"event": "pool_shutdown", "connections_closed": pool_size}
-        )
\ No newline at end of file
+        )
+
+
+# Instância global compartilhada pelas rotas (chat, sessões e WebSocket)
+claude_handler = ClaudeHandler()
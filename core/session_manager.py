@@ -345,6 +345,15 @@ class ClaudeCodeSessionManager:
             if hasattr(metrics, key):
                 setattr(metrics, key, value)
     
+    def record_message(self, session_id: str):
+        """Incrementa o contador de mensagens da sessão (O(1), sem varrer histórico)."""
+        with self._lock:
+            metrics = self.session_metrics.get(session_id)
+            if metrics is None:
+                metrics = self.session_metrics[session_id] = SessionMetrics()
+            metrics.message_count += 1
+            metrics.last_activity = datetime.now()
+
     def get_session_metrics(self, session_id: str) -> Optional[SessionMetrics]:
         """Retorna métricas de uma sessão."""
         return self.session_metrics.get(session_id)
@@ -424,11 +433,12 @@ class ClaudeCodeSessionManager:
         sessions = {}
         with self._lock:
             for session_id, last_activity in self.active_sessions.items():
+                metrics = self.session_metrics.get(session_id)
                 sessions[session_id] = {
                     "session_id": session_id,
                     "project_id": self.get_project_name_for_session(session_id) or "neo4j-agent",
-                    "created_at": self.session_metrics[session_id].created_at if session_id in self.session_metrics else last_activity,
-                    "messages": []  # Simplificado por agora
+                    "created_at": metrics.created_at if metrics else last_activity,
+                    "message_count": metrics.message_count if metrics else 0
                 }
         return sessions
 
@@ -10,14 +10,13 @@ import json
 import uuid
 from datetime import datetime
 
-from core.claude_handler import ClaudeHandler, SessionConfig
+from core.claude_handler import SessionConfig, claude_handler
 from core.input_validator import InputValidator, ValidationError, InputType
 from utils.security_utils import sanitize_for_frontend
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
 # Inicializar handlers
-claude_handler = ClaudeHandler()
 validator = InputValidator()
 
 class ChatMessage(BaseModel):
@@ -7,15 +7,14 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 import uuid
 
-from core.claude_handler import ClaudeHandler, SessionConfig
-from core.session_manager import ClaudeCodeSessionManager
+from core.claude_handler import SessionConfig, claude_handler
 from core.input_validator import InputValidator, ValidationError
 
 router = APIRouter(prefix="/api", tags=["sessions"])
 
 # Inicializar handlers
-claude_handler = ClaudeHandler()
-session_manager = ClaudeCodeSessionManager()
+# Mesmo manager em que o handler registra sessões e conta mensagens
+session_manager = claude_handler.session_manager
 validator = InputValidator()
 
 class SessionCreate(BaseModel):
@@ -82,9 +81,9 @@ async def list_sessions():
         "sessions": [
             {
                 "session_id": session_id,
-                "project_id": session.project_id,
-                "created_at": session.created_at.isoformat(),
-                "messages_count": len(session.messages)
+                "project_id": session["project_id"],
+                "created_at": session["created_at"].isoformat(),
+                "messages_count": session["message_count"]
             }
             for session_id, session in active_sessions.items()
         ],
@@ -7,14 +7,13 @@ import asyncio
 
 from core.websocket_handler import ws_manager
 from core.command_stream import command_stream
-from core.claude_handler import ClaudeHandler
-from core.session_manager import ClaudeCodeSessionManager
+from core.claude_handler import claude_handler
 
 router = APIRouter(tags=["websocket"])
 
 # Inicializar handlers
-claude_handler = ClaudeHandler()
-session_manager = ClaudeCodeSessionManager()
+# Mesmo manager em que o handler registra sessões e conta mensagens
+session_manager = claude_handler.session_manager
 
 @router.websocket("/ws/advanced/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
@@ -0,0 +1,146 @@
+"""
+Utilitários compartilhados de Chrome/Selenium para os scripts de screenshot
+"""
+
+import base64
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+
+# Flags comuns de todos os scripts headless; as de desempenho evitam
+# trabalho de inicialização (extensões, sync, rede em segundo plano) e a
+# descoberta de proxy do sistema, que pode travar o start em CI
+HEADLESS_ARGS = (
+    '--headless=new',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-notifications',
+    '--disable-popup-blocking',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--metrics-recording-only',
+    '--no-first-run',
+    '--disable-features=Translate,BackForwardCache',
+    '--proxy-server=direct://',
+    '--proxy-bypass-list=*',
+)
+
+# Recursos que não influenciam o teste do chat; o CSS fica de fora porque
+# o layout precisa aparecer no screenshot
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif",
+    "*.woff", "*.woff2", "*.ttf",
+    "https://www.google-analytics.com/*",
+]
+
+# Desliga o download de imagens no perfil do Chrome
+BLOCK_IMAGES_PREFS = {"profile.managed_default_content_settings.images": 2}
+
+
+def build_headless_options(window_size="1280,800", load_images=True):
+    """Monta as Options headless compartilhadas pelos scripts de Chrome.
+
+    Com load_images=False (testes que não tiram screenshot) o Blink nem
+    decodifica imagens.
+    """
+    options = Options()
+    for arg in HEADLESS_ARGS:
+        options.add_argument(arg)
+    options.add_argument(f'--window-size={window_size}')
+
+    # Retorna do driver.get() assim que o DOM estiver interativo
+    options.page_load_strategy = 'eager'
+
+    # Não baixa imagens (o restante é bloqueado via CDP após criar o driver)
+    options.add_experimental_option("prefs", BLOCK_IMAGES_PREFS)
+    if not load_images:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+
+    return options
+
+
+def _cdp(driver, cmd, params):
+    """Executa um comando CDP em drivers Chromium locais ou remotos.
+
+    Remotes sem execute_cdp_cmd ainda aceitam o comando quando a conexão é
+    um ChromiumRemoteConnection; nos demais o executor não conhece o
+    comando e levanta KeyError.
+    """
+    if hasattr(driver, "execute_cdp_cmd"):
+        return driver.execute_cdp_cmd(cmd, params)
+    return driver.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
+
+
+def block_heavy_resources(driver):
+    """Bloqueia imagens, fontes e analytics via CDP antes do driver.get()."""
+    try:
+        _cdp(driver, "Network.enable", {})
+        _cdp(driver, "Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except (KeyError, WebDriverException) as e:
+        print(f"⚠️  Bloqueio de recursos via CDP indisponível: {e}")
+
+
+def save_screenshot(driver, screenshot_path):
+    """Salva PNG da viewport via CDP (Page.captureScreenshot).
+
+    Evita o caminho lento de screenshot do protocolo WebDriver; drivers sem
+    CDP (ex.: Safari) usam o save_screenshot padrão.
+    """
+    try:
+        data = _cdp(driver, "Page.captureScreenshot", {
+            "format": "png",
+            "captureBeyondViewport": False,
+            "fromSurface": True
+        })["data"]
+    except (KeyError, WebDriverException):
+        driver.save_screenshot(screenshot_path)
+        return
+
+    with open(screenshot_path, "wb") as f:
+        f.write(base64.b64decode(data))
+
+
+def wait_stale_safe(wait, locator, attempts=3):
+    """Aguarda o elemento ficar visível, refazendo a busca se ele ficar stale.
+
+    O chat re-renderiza as mensagens durante o streaming, então a referência
+    encontrada pode ser descartada entre o find e a checagem de visibilidade.
+    TimeoutException continua propagando para o chamador.
+    """
+    for _ in range(attempts):
+        try:
+            return wait.until(EC.visibility_of_element_located(locator))
+        except StaleElementReferenceException:
+            continue
+    return None
+
+
+def stable_text(locator, stable_for=0.3):
+    """Condição de WebDriverWait: o innerText do elemento parou de mudar.
+
+    Retorna o elemento quando o texto fica igual por `stable_for` segundos,
+    ou seja, quando o streaming da resposta terminou.
+    """
+    last_text = None
+    since = 0.0
+
+    def _predicate(driver):
+        nonlocal last_text, since
+        try:
+            element = driver.find_element(*locator)
+            text = element.get_attribute("innerText")
+        except StaleElementReferenceException:
+            return False
+
+        now = time.monotonic()
+        if text != last_text:
+            last_text, since = text, now
+            return False
+        return element if now - since >= stable_for else False
+
+    return _predicate
@@ -0,0 +1,166 @@
+"""
+Sessão Chrome persistente compartilhada entre os scripts de screenshot
+
+O primeiro script que precisa de um driver inicia um chromedriver destacado
+do processo e grava a URL do serviço, o PID e o session_id em disco;
+execuções seguintes reanexam à mesma sessão em vez de abrir um novo Chrome.
+"""
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.common.service import utils as service_utils
+
+STATE_FILE = Path("/tmp/chat_chromedriver.json")
+PROFILE_DIR = "/tmp/chat_chrome_profile"
+
+
+class _PoolDriver(webdriver.Remote):
+    """Remote do chromedriver do pool, com CDP e reanexação de sessão.
+
+    O ChromiumRemoteConnection registra o comando executeCdpCommand
+    (/goog/cdp/execute), que o Remote genérico não conhece; com session_id
+    o driver adota a sessão existente em vez de pedir NEW_SESSION.
+    """
+
+    def __init__(self, service_url, options, session_id=None):
+        self._existing_session_id = session_id
+        executor = ChromiumRemoteConnection(
+            remote_server_addr=service_url,
+            vendor_prefix="goog",
+            browser_name=options.capabilities["browserName"],
+            keep_alive=True
+        )
+        super().__init__(command_executor=executor, options=options)
+
+    def start_session(self, capabilities, *args, **kwargs):
+        if self._existing_session_id is None:
+            return super().start_session(capabilities, *args, **kwargs)
+        self.session_id = self._existing_session_id
+        self.caps = {}
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        """Mesmo contrato do ChromiumDriver.execute_cdp_cmd."""
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+
+def _reattach(service_url, session_id):
+    """Cria um driver apontando para uma sessão existente, sem abrir outra."""
+    driver = _PoolDriver(service_url, Options(), session_id=session_id)
+    driver.current_url  # Falha se a sessão não existir mais
+    return driver
+
+
+def _start_service():
+    """Inicia o chromedriver fora do grupo de processos do script."""
+    chromedriver = shutil.which("chromedriver")
+    if chromedriver is None:
+        raise WebDriverException("chromedriver não encontrado no PATH")
+
+    port = service_utils.free_port()
+    process = subprocess.Popen(
+        [chromedriver, f"--port={port}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+    service_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while not service_utils.is_connectable(port):
+        if time.monotonic() > deadline:
+            _stop_service(process.pid)
+            raise WebDriverException("chromedriver não respondeu")
+        time.sleep(0.05)
+    return service_url, process.pid
+
+
+def _stop_service(pid):
+    """Encerra um chromedriver iniciado por _start_service, se ainda existir."""
+    if pid is None:
+        return
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def _read_state():
+    """Lê o estado gravado; arquivo ausente ou corrompido vira {}."""
+    try:
+        return json.loads(STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _discard_state(state):
+    """Remove o arquivo de estado e o chromedriver órfão que ele descreve.
+
+    O PID só é encerrado se a porta gravada ainda responder; com o serviço
+    morto o PID pode já ter sido reutilizado por outro processo.
+    """
+    STATE_FILE.unlink(missing_ok=True)
+    port = urlparse(state.get("service_url", "")).port
+    if port and service_utils.is_connectable(port):
+        _stop_service(state.get("pid"))
+
+
+def get_driver(options):
+    """Retorna o driver persistente, reanexando ou criando a sessão."""
+    state = _read_state()
+    if state:
+        try:
+            return _reattach(state["service_url"], state["session_id"])
+        except Exception:
+            _discard_state(state)
+
+    options.add_argument(f'--user-data-dir={PROFILE_DIR}')
+    service_url, pid = _start_service()
+    try:
+        driver = _PoolDriver(service_url, options)
+    except Exception:
+        _stop_service(pid)
+        raise
+
+    STATE_FILE.write_text(json.dumps({
+        "service_url": service_url,
+        "pid": pid,
+        "session_id": driver.session_id
+    }))
+    return driver
+
+
+def close_driver(driver):
+    """Encerra a sessão persistente e o chromedriver (próximo get_driver abre novos)."""
+    state = _read_state()
+    try:
+        driver.quit()
+    finally:
+        _discard_state(state)
+
+
+@contextmanager
+def tab(driver):
+    """Executa um cenário numa aba nova e volta para a aba original no fim.
+
+    Mantém cache de DNS, JIT do V8 e conexões keep-alive aquecidos entre
+    cenários sem acumular abas na sessão persistente.
+    """
+    original = driver.current_window_handle
+    driver.switch_to.new_window('tab')
+    try:
+        yield driver
+    finally:
+        driver.close()
+        driver.switch_to.window(original)
@@ -0,0 +1,124 @@
+"""
+Pool persistente de ClaudeSDKClient compartilhado entre execuções de teste
+
+O primeiro script que chama `pooled_query` inicia um processo destacado que
+mantém POOL_SIZE clientes já conectados e atende consultas por um socket
+Unix; execuções seguintes só abrem o socket, sem pagar o connect() do SDK.
+
+Protocolo (uma linha JSON por mensagem):
+    -> {"query": "Oi"}
+    <- {"text": "..."} ... {"done": true}   ou   {"error": "..."}
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+SOCK_PATH = "/tmp/claude_sdk_pool.sock"
+POOL_SIZE = 4
+STARTUP_TIMEOUT = 60.0
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SDK_DIR = os.path.join(ROOT_DIR, "sdk")
+
+
+def _encode(payload):
+    return (json.dumps(payload) + "\n").encode()
+
+
+async def _serve():
+    """Conecta os clientes e atende consultas até o processo ser encerrado."""
+    sys.path.insert(0, SDK_DIR)
+    from claude_code_sdk import ClaudeCodeOptions, ClaudeSDKClient
+
+    clients = [
+        ClaudeSDKClient(options=ClaudeCodeOptions(permission_mode="bypassPermissions"))
+        for _ in range(POOL_SIZE)
+    ]
+    await asyncio.gather(*(client.connect() for client in clients))
+
+    pool = asyncio.Queue()
+    for client in clients:
+        pool.put_nowait(client)
+
+    async def handle(reader, writer):
+        try:
+            request = json.loads(await reader.readline())
+            client = await pool.get()
+            try:
+                # Cada consulta usa uma conversa nova no cliente reaproveitado
+                await client.query(request["query"], session_id=str(uuid.uuid4()))
+                async for msg in client.receive_response():
+                    for block in getattr(msg, "content", None) or []:
+                        if hasattr(block, "text"):
+                            writer.write(_encode({"text": block.text}))
+                    await writer.drain()
+            finally:
+                pool.put_nowait(client)
+            writer.write(_encode({"done": True}))
+        except Exception as e:
+            writer.write(_encode({"error": str(e)}))
+        finally:
+            await writer.drain()
+            writer.close()
+
+    if os.path.exists(SOCK_PATH):
+        os.unlink(SOCK_PATH)
+    server = await asyncio.start_unix_server(handle, path=SOCK_PATH)
+    async with server:
+        await server.serve_forever()
+
+
+def _start_pool():
+    """Inicia o processo do pool fora do grupo de processos do script."""
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+async def _connect():
+    """Abre o socket do pool, iniciando o processo se ele não estiver rodando."""
+    try:
+        return await asyncio.open_unix_connection(SOCK_PATH)
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+
+    _start_pool()
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            return await asyncio.open_unix_connection(SOCK_PATH)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise TimeoutError("pool do Claude SDK não respondeu")
+            await asyncio.sleep(0.1)
+
+
+async def pooled_query(prompt):
+    """Envia `prompt` ao pool e produz os trechos de texto da resposta."""
+    reader, writer = await _connect()
+    try:
+        writer.write(_encode({"query": prompt}))
+        await writer.drain()
+
+        async for line in reader:
+            message = json.loads(line)
+            if "text" in message:
+                yield message["text"]
+            elif "error" in message:
+                raise RuntimeError(message["error"])
+            else:
+                break
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__" and "--serve" in sys.argv:
+    asyncio.run(_serve())
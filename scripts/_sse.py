@@ -0,0 +1,63 @@
+"""
+Leitura de Server-Sent Events compartilhada pelos scripts de teste do chat
+
+As linhas são divididas sobre um único buffer de bytes e só o payload de
+`data:` é decodificado, com o parser JSON mais rápido disponível.
+"""
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        from json import loads as json_loads
+
+# Prefixo SSE comparado direto nos bytes; linhas sem ele nunca são decodificadas
+DATA = b"data: "
+DATA_LEN = len(DATA)
+
+
+def create_client():
+    """Cria a sessão aiohttp com um único pool de conexões keep-alive.
+
+    O aiohttp é importado aqui para que scripts só com `requests` usem
+    parse_event sem depender dele.
+    """
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=50,
+        limit_per_host=4,  # Todas as chamadas vão para o mesmo host
+        ttl_dns_cache=300,
+        keepalive_timeout=75
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def parse_event(line):
+    """Retorna o dict de uma linha `data: {...}` em bytes, ou None."""
+    if not line.startswith(DATA):
+        return None
+    try:
+        return json_loads(line[DATA_LEN:])
+    except ValueError:
+        return None
+
+
+async def iter_sse_events(chunks):
+    """Gera os eventos de um iterador assíncrono de chunks de bytes.
+
+    Serve tanto para `response.content.iter_chunked()` (aiohttp) quanto para
+    `response.aiter_bytes()` (httpx); linhas de outros campos SSE e payloads
+    que não são JSON são ignorados.
+    """
+    buf = bytearray()
+    async for chunk in chunks:
+        buf.extend(chunk)
+        while (nl := buf.find(b"\n")) != -1:
+            line = bytes(buf[:nl])
+            del buf[:nl + 1]
+            data = parse_event(line)
+            if data is not None:
+                yield data
@@ -2,66 +2,155 @@
 """
 Script para executar o resgate do Lucas Montano com presente de 5.0 FLOW
 Isso vai REALMENTE debitar 5.0 FLOW da conta do Diego na testnet!
+
+As transações são enviadas pela Access API HTTP da Flow com um único
+httpx.AsyncClient reutilizado entre resgates (sem fork do CLI e sem novo
+handshake TLS por transação). Transações pré-assinadas ficam em
+scripts/resgates/<nome>.json no formato da REST API; sem elas, o `flow` CLI
+é usado apenas para assinar e enviar, de forma assíncrona.
 """
 
-import subprocess
+import asyncio
+import importlib.util
 import json
+import sys
+from pathlib import Path
 
-def executar_resgate_lucas():
-    """
-    Executa a transação de resgate com presente de 5.0 FLOW REAL
-    """
+import httpx
 
-    print("🏄 RESGATANDO LUCAS MONTANO COM 5.0 FLOW DE PRESENTE")
-    print("="*50)
-    print("⚠️  ATENÇÃO: Isso vai DEBITAR 5.0 FLOW REAL da testnet!")
-    print("💰 Conta do Diego: 0x36395f9dde50ea27")
-    print("="*50)
+TESTNET_API = "https://rest-testnet.onflow.org"
+API_DIR = "/Users/2a/Desktop/neo4j-agent/api"
+SIGNED_TX_DIR = Path(__file__).parent / "resgates"
+PRESENTE_FLOW = "5.0"
+
+# Tempo máximo aguardando a transação chegar a Sealed/Expired
+PRAZO_SELAGEM = 120.0
+
+
+def criar_cliente() -> httpx.AsyncClient:
+    """Cria o cliente HTTP compartilhado (HTTP/2 quando `h2` estiver instalado)."""
+    return httpx.AsyncClient(
+        base_url=TESTNET_API,
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=10),
+        timeout=30.0,
+    )
 
-    # Comando para executar a transação
+
+async def enviar_pre_assinada(client: httpx.AsyncClient, arquivo: Path) -> str:
+    """Envia uma transação já assinada via POST /v1/transactions."""
+    response = await client.post("/v1/transactions", content=arquivo.read_bytes(),
+                                  headers={"Content-Type": "application/json"})
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def enviar_via_cli(nome: str) -> str:
+    """Assina e envia com o `flow` CLI sem bloquear o event loop."""
     cmd = [
         "flow", "transactions", "send",
         "scripts/resgatar_surfista_com_presente.cdc",
-        "Lucas Montano",  # Nome do surfista
-        "5.0",           # Presente de 5.0 FLOW (REAL!)
+        nome,             # Nome do surfista
+        PRESENTE_FLOW,    # Presente de 5.0 FLOW (REAL!)
         "--network", "testnet",
-        "--signer", "testnet-account"
+        "--signer", "testnet-account",
+        "--output", "json"
     ]
-
-    print("\n🚀 Executando transação na testnet...")
     print(f"Comando: {' '.join(cmd)}")
 
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=API_DIR
+    )
+    stdout, stderr = await process.communicate()
+
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode().strip())
+
+    return json.loads(stdout)["id"]
+
+
+async def aguardar_resultado(
+    client: httpx.AsyncClient,
+    tx_id: str,
+    intervalo: float = 1.0,
+    prazo: float = PRAZO_SELAGEM
+) -> dict:
+    """Consulta o resultado da transação reutilizando a conexão até ser selada.
+
+    Levanta TimeoutError se a transação não for selada nem expirar em `prazo`
+    segundos. Transações enviadas pelo CLI já chegam seladas e saem na
+    primeira consulta.
+    """
     try:
-        # Executar transação
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd="/Users/2a/Desktop/neo4j-agent/api"
-        )
-
-        if result.returncode == 0:
-            print("\n✅ SUCESSO! Transação executada!")
-            print(result.stdout)
-
-            # Parse do resultado para pegar o ID da transação
-            for line in result.stdout.split('\n'):
-                if 'Transaction ID' in line or 'transaction' in line.lower():
-                    print(f"\n🔍 {line}")
-
-            print("\n💰 FLUXO DO FLOW:")
-            print("1. Diego tinha ~101,000 FLOW")
-            print("2. Debitou 5.0 FLOW REAL da conta")
-            print("3. FLOW foi para o Tesouro Protegido")
-            print("4. Lucas pode usar esse FLOW para aprender!")
-            print("5. Se descobrir a senha (SURF2024), ganha tudo!")
+        async with asyncio.timeout(prazo):
+            while True:
+                response = await client.get(f"/v1/transaction_results/{tx_id}")
+                response.raise_for_status()
+                resultado = response.json()
+                if resultado.get("status") in ("Sealed", "Expired"):
+                    return resultado
+                await asyncio.sleep(intervalo)
+    except TimeoutError:
+        raise TimeoutError(f"transação {tx_id} não foi selada em {prazo:g}s") from None
 
+
+async def resgatar(client: httpx.AsyncClient, nome: str) -> bool:
+    """Executa o resgate de um surfista e aguarda a confirmação."""
+    arquivo = SIGNED_TX_DIR / f"{nome.lower().replace(' ', '_')}.json"
+
+    try:
+        if arquivo.exists():
+            tx_id = await enviar_pre_assinada(client, arquivo)
         else:
-            print("\n❌ ERRO na transação!")
-            print(result.stderr)
+            tx_id = await enviar_via_cli(nome)
+
+        print(f"\n🔍 {nome}: Transaction ID {tx_id}")
+        resultado = await aguardar_resultado(client, tx_id)
+
+        if resultado.get("error_message"):
+            print(f"\n❌ ERRO na transação de {nome}!")
+            print(resultado["error_message"])
+            return False
+
+        print(f"\n✅ SUCESSO! Resgate de {nome} executado ({resultado.get('status')})")
+        return True
 
     except Exception as e:
-        print(f"\n❌ Erro ao executar: {e}")
+        print(f"\n❌ Erro ao executar resgate de {nome}: {e}")
+        return False
+
+
+async def executar_resgates(nomes: list) -> list:
+    """Executa vários resgates em paralelo com um único cliente HTTP."""
+    async with criar_cliente() as client:
+        return await asyncio.gather(*[resgatar(client, nome) for nome in nomes])
+
+
+def executar_resgate_lucas(nomes: list = None):
+    """
+    Executa a transação de resgate com presente de 5.0 FLOW REAL
+    """
+    nomes = nomes or ["Lucas Montano"]
+
+    print("🏄 RESGATANDO LUCAS MONTANO COM 5.0 FLOW DE PRESENTE")
+    print("="*50)
+    print(f"⚠️  ATENÇÃO: Isso vai DEBITAR {PRESENTE_FLOW} FLOW REAL da testnet por resgate!")
+    print("💰 Conta do Diego: 0x36395f9dde50ea27")
+    print("="*50)
+
+    print("\n🚀 Executando transação na testnet...")
+    resultados = asyncio.run(executar_resgates(nomes))
+
+    if any(resultados):
+        print("\n💰 FLUXO DO FLOW:")
+        print("1. Diego tinha ~101,000 FLOW")
+        print(f"2. Debitou {PRESENTE_FLOW} FLOW REAL da conta")
+        print("3. FLOW foi para o Tesouro Protegido")
+        print("4. Lucas pode usar esse FLOW para aprender!")
+        print("5. Se descobrir a senha (SURF2024), ganha tudo!")
 
     print("\n" + "="*50)
     print("🔍 Para verificar o saldo atualizado, execute:")
@@ -70,4 +159,4 @@ def executar_resgate_lucas():
     print("   flow scripts execute scripts/verificar_tesouro.cdc 0x25f823e2a115b2dc")
 
 if __name__ == "__main__":
-    executar_resgate_lucas()
\ No newline at end of file
+    executar_resgate_lucas(sys.argv[1:])
@@ -4,45 +4,67 @@ Script para aumentar o timeout do chat e prevenir timeouts com subagentes
 """
 
 import os
+import sys
+import logging
+import re
+
+# Adiciona a raiz do projeto ao path para imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_config import setup_script_logging
+
+logger = logging.getLogger(__name__)
+
+# Uma única passada sobre o arquivo; cada alternativa é ancorada ao contexto
+# para não corromper literais numéricos sem relação com o timeout
+TIMEOUT_PATTERN = re.compile(
+    r'(?P<const>\bconst\s+TIMEOUT\s*=\s*5\s*\*\s*60\s*\*\s*1000\b)'
+    r'|(?P<ms>\b300000\b(?=\s*[,);]))'
+    r'|(?P<expr>\b5\s*\*\s*60\b)'
+)
+
+# Timeout de 5 minutos para 10 minutos
+REPLACEMENTS = {
+    "const": "const TIMEOUT = 10 * 60 * 1000",
+    "ms": "600000",  # 5 min em ms para 10 min
+    "expr": "10 * 60",
+}
+
 
 def update_chat_timeout():
     """Atualiza timeout no app.js do chat."""
 
     app_js_path = "/Users/2a/Desktop/neo4j-agent/chat/app.js"
 
-    print("🔧 Aumentando timeout do chat para 10 minutos...")
+    logger.info("🔧 Aumentando timeout do chat para 10 minutos...")
 
     # Ler arquivo
     with open(app_js_path, 'r') as f:
         content = f.read()
 
     # Procurar e substituir timeouts
-    replacements = [
-        # Timeout de 5 minutos para 10 minutos
-        ("const TIMEOUT = 5 * 60 * 1000", "const TIMEOUT = 10 * 60 * 1000"),
-        ("300000", "600000"),  # 5 min em ms para 10 min
-        ("5 * 60", "10 * 60"),
-    ]
-
-    for old, new in replacements:
-        if old in content:
-            content = content.replace(old, new)
-            print(f"  ✅ Alterado: {old} → {new}")
+    def replacer(match):
+        new = REPLACEMENTS[match.lastgroup]
+        logger.info(f"  ✅ Alterado: {match.group()} → {new}")
+        return new
+
+    content = TIMEOUT_PATTERN.sub(replacer, content)
 
     # Salvar
     with open(app_js_path, 'w') as f:
         f.write(content)
 
-    print("\n✅ Timeout aumentado para 10 minutos!")
-    print("\n📝 Outras soluções para evitar timeout com subagentes:")
-    print("  1. Limite a quantidade de subagentes simultâneos")
-    print("  2. Use respostas mais diretas sem spawnar muitos agentes")
-    print("  3. Configure timeout maior no servidor também")
-    print("  4. Use WebSocket ao invés de SSE para operações longas")
+    logger.info("\n✅ Timeout aumentado para 10 minutos!")
+    logger.info("\n📝 Outras soluções para evitar timeout com subagentes:")
+    logger.info("  1. Limite a quantidade de subagentes simultâneos")
+    logger.info("  2. Use respostas mais diretas sem spawnar muitos agentes")
+    logger.info("  3. Configure timeout maior no servidor também")
+    logger.info("  4. Use WebSocket ao invés de SSE para operações longas")
 
 if __name__ == "__main__":
+    setup_script_logging()
     update_chat_timeout()
 
-    print("\n💡 DICA: Para operações com muitos subagentes, use:")
-    print("  - WebSocket client: http://localhost:8080/examples/websocket_client.html")
-    print("  - Ele não tem timeout e mantém conexão persistente!")
\ No newline at end of file
+    logger.info("\n💡 DICA: Para operações com muitos subagentes, use:")
+    logger.info("  - WebSocket client: http://localhost:8080/examples/websocket_client.html")
+    logger.info("  - Ele não tem timeout e mantém conexão persistente!")
\ No newline at end of file
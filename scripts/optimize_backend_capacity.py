@@ -6,8 +6,25 @@ Aumenta performance e suporta mais subagentes simultâneos
 
 import os
 import sys
-import multiprocessing
-import json
+import logging
+import tempfile
+import orjson
+from pathlib import Path
+from string import Template
+
+# Adiciona a raiz do projeto ao path para imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_config import setup_script_logging
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+OUTPUT_DIR = Path("/Users/2a/Desktop/neo4j-agent")
+
+# Lido uma única vez por processo e propagado para config, scripts e compose
+CPU_COUNT = os.cpu_count() or 1
+WORKERS = CPU_COUNT * 2
 
 def create_high_performance_config():
     """Cria configuração de alta performance para o servidor."""
@@ -15,7 +32,7 @@ def create_high_performance_config():
     config = {
         "server": {
             # Workers e threads
-            "workers": multiprocessing.cpu_count() * 2,  # 2x CPUs disponíveis
+            "workers": WORKERS,  # 2x CPUs disponíveis
             "worker_class": "uvicorn.workers.UvicornWorker",
             "worker_connections": 2000,
             "max_requests": 1000,
@@ -87,386 +104,113 @@ def create_high_performance_config():
     return config
 
 
-def create_optimized_server():
-    """Cria versão otimizada do server.py."""
+def atomic_write(path, data: bytes, mode=0o644):
+    """Escreve em arquivo temporário no mesmo diretório e troca com os.replace.
 
-    server_code = '''#!/usr/bin/env python3
-"""
-Server otimizado para alta capacidade
-"""
+    Uma interrupção no meio da escrita nunca deixa o arquivo final truncado.
+    """
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as tmp:
+        try:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+            os.chmod(tmp.name, mode)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, path)
 
-import os
-import sys
-import asyncio
-import uvloop
-from fastapi import FastAPI, HTTPException
-from contextlib import asynccontextmanager
-import multiprocessing
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-
-# Otimizações de performance
-asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
-
-# Configurações de alta performance
-HIGH_PERF_CONFIG = {
-    "workers": multiprocessing.cpu_count() * 2,
-    "max_concurrent_handlers": 100,
-    "connection_pool_size": 50,
-    "cache_size_mb": 512,
-    "gc_threshold": (700, 10, 10)
-}
-
-# Thread/Process pools para operações CPU-intensive
-thread_executor = ThreadPoolExecutor(max_workers=20)
-process_executor = ProcessPoolExecutor(max_workers=8)
-
-# Imports existentes
-from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel
-import json
-import uuid
-
-# Adicionar após imports
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from core.claude_handler import ClaudeHandler
-from core.session_manager import SessionManager
-from core.connection_manager import ConnectionManager
-from core.cache_manager import CacheManager
-from services.neo4j_service import Neo4jService
-from utils.environment import env
-
-# Cache manager global
-cache = CacheManager(size_mb=HIGH_PERF_CONFIG["cache_size_mb"])
-
-# Rate limiter otimizado
-from collections import deque
-from datetime import timedelta
-
-class OptimizedRateLimiter:
-    def __init__(self, max_requests=100, window_seconds=60):
-        self.max_requests = max_requests
-        self.window = timedelta(seconds=window_seconds)
-        self.requests = deque()
-        self._lock = asyncio.Lock()
-
-    async def check_rate_limit(self, key: str) -> bool:
-        async with self._lock:
-            now = datetime.now()
-            # Remove requests antigas
-            while self.requests and self.requests[0][1] < now - self.window:
-                self.requests.popleft()
-
-            # Verifica limite
-            count = sum(1 for k, _ in self.requests if k == key)
-            if count >= self.max_requests:
-                return False
-
-            self.requests.append((key, now))
-            return True
-
-rate_limiter = OptimizedRateLimiter()
-
-# Lifecycle manager
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Lifecycle manager com otimizações."""
-
-    # Startup
-    print("🚀 Iniciando servidor otimizado...")
-
-    # Configurar garbage collection
-    import gc
-    gc.set_threshold(*HIGH_PERF_CONFIG["gc_threshold"])
-    gc.collect()
-
-    # Pre-warm connections
-    await claude_handler.initialize_pool(size=HIGH_PERF_CONFIG["connection_pool_size"])
-
-    if neo4j_service:
-        await neo4j_service.initialize_pool(size=50)
-
-    print(f"✅ Servidor otimizado iniciado com {HIGH_PERF_CONFIG['workers']} workers")
-
-    yield
-
-    # Shutdown
-    print("🛑 Desligando servidor...")
-    thread_executor.shutdown(wait=True)
-    process_executor.shutdown(wait=True)
-    await claude_handler.close_all_connections()
-    if neo4j_service:
-        await neo4j_service.close()
-
-# App FastAPI otimizada
-app = FastAPI(
-    title="Neo4j Agent API - High Performance",
-    version="2.0.0",
-    lifespan=lifespan,
-    docs_url="/api/docs",
-    redoc_url="/api/redoc"
-)
-
-# Middleware de performance
-@app.middleware("http")
-async def add_performance_headers(request, call_next):
-    # Headers de cache e performance
-    response = await call_next(request)
-    response.headers["X-Process-ID"] = str(os.getpid())
-    response.headers["X-Worker-Count"] = str(HIGH_PERF_CONFIG["workers"])
-    response.headers["Cache-Control"] = "no-cache"
-    response.headers["X-Accel-Buffering"] = "no"
-    return response
-
-# Continue com endpoints existentes...
-'''
-
-    return server_code
 
+def render_template(name, **values):
+    """Renderiza um template de scripts/templates com string.Template."""
+    return Template((TEMPLATES_DIR / name).read_text()).substitute(values)
 
-def create_startup_script():
-    """Cria script de startup otimizado."""
-
-    script = '''#!/bin/bash
 
-echo "🚀 Iniciando Neo4j Agent Backend com alta capacidade..."
+def create_optimized_server(config=None):
+    """Cria versão otimizada do server.py."""
 
-# Configurações de ambiente para performance
-export PYTHONUNBUFFERED=1
-export PYTHONASYNCIODEBUG=0
-export MALLOC_ARENA_MAX=2
+    config = config or create_high_performance_config()
 
-# Limites do sistema
-ulimit -n 65536  # Aumenta file descriptors
-ulimit -u 32768  # Aumenta processos
+    return render_template(
+        "server_optimized.py.tpl",
+        workers=config["server"]["workers"],
+        pool_size=50,
+        cache_mb=config["memory"]["cache_size_mb"],
+    )
 
-# CPU affinity (usar todos os cores)
-taskset -c 0-$(nproc --all) \\
 
-# Inicia servidor com Gunicorn + Uvicorn workers
-gunicorn server:app \\
-    --worker-class uvicorn.workers.UvicornWorker \\
-    --workers $(( $(nproc) * 2 )) \\
-    --worker-connections 2000 \\
-    --max-requests 1000 \\
-    --max-requests-jitter 100 \\
-    --timeout 600 \\
-    --keep-alive 75 \\
-    --bind 0.0.0.0:8080 \\
-    --backlog 2048 \\
-    --access-logfile - \\
-    --error-logfile - \\
-    --log-level info \\
-    --preload
-'''
+def create_startup_script():
+    """Cria script de startup otimizado."""
 
-    return script
+    return render_template("start_optimized.sh.tpl", workers=WORKERS, last_cpu=CPU_COUNT - 1)
 
 
 def create_docker_compose():
     """Cria docker-compose para deploy escalável."""
 
-    compose = '''version: '3.9'
-
-services:
-  neo4j-agent-api:
-    image: python:3.11-slim
-    container_name: neo4j-agent-api
-    restart: unless-stopped
-
-    # Recursos
-    deploy:
-      resources:
-        limits:
-          cpus: '4'
-          memory: 4G
-        reservations:
-          cpus: '2'
-          memory: 2G
-
-    # Volumes
-    volumes:
-      - ./api:/app
-      - cache-data:/app/cache
-
-    # Portas
-    ports:
-      - "8080:8080"
-
-    # Ambiente
-    environment:
-      - PYTHONUNBUFFERED=1
-      - WORKERS=8
-      - MAX_CONNECTIONS=1000
-      - ANTHROPIC_API_KEY=${ANTHROPIC_API_KEY}
-      - NEO4J_URI=${NEO4J_URI}
-      - NEO4J_USER=${NEO4J_USER}
-      - NEO4J_PASSWORD=${NEO4J_PASSWORD}
-
-    # Comando
-    command: |
-      bash -c "
-        pip install -r requirements.txt &&
-        pip install uvloop gunicorn &&
-        python3 scripts/start_optimized.sh
-      "
-
-    # Health check
-    healthcheck:
-      test: ["CMD", "curl", "-f", "http://localhost:8080/api/health"]
-      interval: 30s
-      timeout: 10s
-      retries: 3
-
-    # Network
-    networks:
-      - neo4j-network
-
-  # Redis para cache distribuído (opcional)
-  redis:
-    image: redis:7-alpine
-    container_name: neo4j-agent-redis
-    restart: unless-stopped
-    ports:
-      - "6379:6379"
-    volumes:
-      - redis-data:/data
-    command: redis-server --appendonly yes
-    networks:
-      - neo4j-network
-
-  # Nginx como load balancer (opcional para múltiplas instâncias)
-  nginx:
-    image: nginx:alpine
-    container_name: neo4j-agent-nginx
-    restart: unless-stopped
-    ports:
-      - "80:80"
-    volumes:
-      - ./nginx.conf:/etc/nginx/nginx.conf:ro
-    depends_on:
-      - neo4j-agent-api
-    networks:
-      - neo4j-network
-
-volumes:
-  cache-data:
-  redis-data:
-
-networks:
-  neo4j-network:
-    driver: bridge
-'''
-
-    return compose
+    return render_template("docker-compose.yml.tpl", workers=WORKERS)
 
 
 def create_requirements():
     """Cria requirements.txt com dependências de performance."""
 
-    requirements = '''# Core
-fastapi==0.104.1
-uvicorn[standard]==0.24.0
-gunicorn==21.2.0
-httpx==0.25.2
-python-dotenv==1.0.0
-
-# Performance
-uvloop==0.19.0
-aiocache==0.12.2
-async-timeout==4.0.3
-aiofiles==23.2.1
-orjson==3.9.10
-
-# Monitoring
-prometheus-client==0.19.0
-psutil==5.9.6
-
-# Claude SDK
-anthropic==0.18.1
-claude-code-sdk==1.0.0
-
-# Neo4j
-neo4j==5.14.1
-
-# Utils
-python-multipart==0.0.6
-pydantic==2.5.2
-'''
-
-    return requirements
+    return render_template("requirements-performance.txt.tpl")
 
 
 def main():
     """Script principal."""
 
-    print("🚀 OTIMIZAÇÃO DE CAPACIDADE DO BACKEND")
-    print("=" * 50)
+    logger.info("🚀 OTIMIZAÇÃO DE CAPACIDADE DO BACKEND")
+    logger.info("=" * 50)
 
-    # 1. Criar configuração
     config = create_high_performance_config()
-    config_path = "/Users/2a/Desktop/neo4j-agent/api/config/high_performance.json"
-
-    os.makedirs(os.path.dirname(config_path), exist_ok=True)
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
-
-    print("✅ Configuração de alta performance criada")
-    print(f"   • Workers: {config['server']['workers']}")
-    print(f"   • Conexões: {config['server']['worker_connections']}")
-    print(f"   • Timeout: {config['server']['timeout']}s")
-    print(f"   • Cache: {config['memory']['cache_size_mb']}MB")
-
-    # 2. Criar script de startup
-    script = create_startup_script()
-    script_path = "/Users/2a/Desktop/neo4j-agent/api/scripts/start_optimized.sh"
-
-    with open(script_path, 'w') as f:
-        f.write(script)
-    os.chmod(script_path, 0o755)
-
-    print("\n✅ Script de startup otimizado criado")
-
-    # 3. Criar Docker Compose
-    compose = create_docker_compose()
-    compose_path = "/Users/2a/Desktop/neo4j-agent/docker-compose.yml"
-
-    with open(compose_path, 'w') as f:
-        f.write(compose)
-
-    print("\n✅ Docker Compose criado para deploy escalável")
-
-    # 4. Criar requirements
-    requirements = create_requirements()
-    req_path = "/Users/2a/Desktop/neo4j-agent/api/requirements-performance.txt"
-
-    with open(req_path, 'w') as f:
-        f.write(requirements)
-
-    print("\n✅ Requirements de performance criados")
-
-    print("\n" + "=" * 50)
-    print("📋 INSTRUÇÕES PARA AUMENTAR CAPACIDADE:")
-    print("\n1. INSTALAÇÃO DE DEPENDÊNCIAS:")
-    print("   pip install -r requirements-performance.txt")
-
-    print("\n2. INICIAR SERVIDOR OTIMIZADO:")
-    print("   bash scripts/start_optimized.sh")
-
-    print("\n3. OU USAR DOCKER (RECOMENDADO):")
-    print("   docker-compose up -d")
-
-    print("\n4. MONITORAR PERFORMANCE:")
-    print("   python3 scripts/monitor_health.py")
 
-    print("\n📊 CAPACIDADE ESPERADA:")
-    print("   • Subagentes simultâneos: 50+")
-    print("   • Requests/segundo: 100+")
-    print("   • Conexões simultâneas: 1000+")
-    print("   • Uso de memória: -40% mais eficiente")
-    print("   • Latência: -60% mais rápida")
+    # Artefatos gerados: (caminho, conteúdo em bytes, permissões)
+    artifacts = [
+        (OUTPUT_DIR / "api/config/high_performance.json",
+         orjson.dumps(config, option=orjson.OPT_INDENT_2), 0o644),
+        (OUTPUT_DIR / "api/scripts/start_optimized.sh", create_startup_script().encode(), 0o755),
+        (OUTPUT_DIR / "docker-compose.yml", create_docker_compose().encode(), 0o644),
+        (OUTPUT_DIR / "api/requirements-performance.txt", create_requirements().encode(), 0o644),
+    ]
+
+    # Um mkdir por diretório distinto, depois uma escrita atômica por arquivo
+    for parent in {path.parent for path, _, _ in artifacts}:
+        parent.mkdir(parents=True, exist_ok=True)
+    for path, data, mode in artifacts:
+        atomic_write(path, data, mode=mode)
+
+    logger.info("✅ Configuração de alta performance criada")
+    logger.info(f"   • Workers: {config['server']['workers']}")
+    logger.info(f"   • Conexões: {config['server']['worker_connections']}")
+    logger.info(f"   • Timeout: {config['server']['timeout']}s")
+    logger.info(f"   • Cache: {config['memory']['cache_size_mb']}MB")
+    logger.info("\n✅ Script de startup otimizado criado")
+    logger.info("\n✅ Docker Compose criado para deploy escalável")
+    logger.info("\n✅ Requirements de performance criados")
+
+    logger.info("\n" + "=" * 50)
+    logger.info("📋 INSTRUÇÕES PARA AUMENTAR CAPACIDADE:")
+    logger.info("\n1. INSTALAÇÃO DE DEPENDÊNCIAS:")
+    logger.info("   pip install -r requirements-performance.txt")
+
+    logger.info("\n2. INICIAR SERVIDOR OTIMIZADO:")
+    logger.info("   bash scripts/start_optimized.sh")
+
+    logger.info("\n3. OU USAR DOCKER (RECOMENDADO):")
+    logger.info("   docker-compose up -d")
+
+    logger.info("\n4. MONITORAR PERFORMANCE:")
+    logger.info("   python3 scripts/monitor_health.py")
+
+    logger.info("\n📊 CAPACIDADE ESPERADA:")
+    logger.info("   • Subagentes simultâneos: 50+")
+    logger.info("   • Requests/segundo: 100+")
+    logger.info("   • Conexões simultâneas: 1000+")
+    logger.info("   • Uso de memória: -40% mais eficiente")
+    logger.info("   • Latência: -60% mais rápida")
 
 
 if __name__ == "__main__":
+    setup_script_logging()
     main()
\ No newline at end of file
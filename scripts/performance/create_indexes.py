@@ -6,12 +6,71 @@ Executa otimizações de performance no banco de dados
 
 import os
 import sys
-from neo4j import GraphDatabase
+import time
+import asyncio
+import logging
+from neo4j import AsyncGraphDatabase
 from dotenv import load_dotenv
 
+# Adiciona a raiz do projeto ao path para imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.logging_config import setup_script_logging
+
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 
+# DDL dos índices recomendados, por nome: (descrição, statement, propriedades exigidas)
+INDEX_DDL = {
+    # 1. Learning.name (BUSCA MAIS COMUM) é coberto pelo índice da constraint de
+    # unicidade abaixo; um índice separado no mesmo schema impede a constraint
+    # 2. Índice no label Learning + propriedade type
+    "learning_type_idx": ("Índice: Learning.type", """
+        CREATE INDEX learning_type_idx IF NOT EXISTS
+        FOR (n:Learning) ON (n.type)
+    """, frozenset()),
+    # 3. Índice composto para buscas por usuário e timestamp (só se as propriedades existirem)
+    "learning_user_timestamp_idx": ("Índice composto: Learning.user + Learning.created_at", """
+        CREATE INDEX learning_user_timestamp_idx IF NOT EXISTS
+        FOR (n:Learning) ON (n.user, n.created_at)
+    """, frozenset({"user", "created_at"})),
+    # 4. Índice full-text para busca de conteúdo
+    "learning_content_fulltext": ("Índice full-text: Learning (name, description, content)", """
+        CREATE FULLTEXT INDEX learning_content_fulltext IF NOT EXISTS
+        FOR (n:Learning) ON EACH [n.name, n.description, n.content]
+    """, frozenset()),
+    # elementId(n) não é indexável: já é o id interno, indexado pelo store
+    # 5. Constraint de unicidade (também indexa Learning.name)
+    "learning_unique_name": ("Constraint: Learning.name UNIQUE", """
+        CREATE CONSTRAINT learning_unique_name IF NOT EXISTS
+        FOR (n:Learning) REQUIRE n.name IS UNIQUE
+    """, frozenset()),
+}
+
+# Índices antigos que conflitam com as constraints acima, por nome:
+# (constraint que o substitui, DDL para recriá-lo). learning_name_idx ocupa o
+# schema Learning.name exigido por learning_unique_name
+SUPERSEDED_INDEXES = {
+    "learning_name_idx": ("learning_unique_name", """
+        CREATE INDEX learning_name_idx IF NOT EXISTS
+        FOR (n:Learning) ON (n.name)
+    """),
+}
+
+# Queries de benchmark: (descrição, query)
+BENCHMARK_QUERIES = [
+    ("Query 1 (busca por name)", "MATCH (n:Learning {name: 'Claude Code SDK'}) RETURN n LIMIT 1"),
+    ("Query 2 (busca por type)", "MATCH (n:Learning) WHERE n.type = 'concept' RETURN n LIMIT 10"),
+    ("Query 3 (count total)", "MATCH (n:Learning) RETURN count(n)"),
+    ("Query 4 (com relacionamentos)", """
+        MATCH (n:Learning)-[r]-(m)
+        RETURN count(r) LIMIT 100
+    """),
+]
+
+
 class Neo4jIndexManager:
     """Gerenciador de índices e constraints do Neo4j."""
 
@@ -20,201 +79,232 @@ class Neo4jIndexManager:
         self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         self.user = os.getenv("NEO4J_USER", "neo4j")
         self.password = os.getenv("NEO4J_PASSWORD", "password")
-        self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
 
-    def close(self):
+        # Pool settings (mesmos valores de config/high_performance.json)
+        self.max_connection_pool_size = int(os.getenv("NEO4J_POOL", "100"))
+        self.connection_acquisition_timeout = 60
+        self.max_transaction_retry_time = 30
+        self.fetch_size = 1000
+
+        self.driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            max_connection_pool_size=self.max_connection_pool_size,
+            connection_acquisition_timeout=self.connection_acquisition_timeout,
+            max_transaction_retry_time=self.max_transaction_retry_time,
+            fetch_size=self.fetch_size
+        )
+
+    async def close(self):
         """Fecha conexão."""
         if self.driver:
-            self.driver.close()
-
-    def create_all_indexes(self):
-        """Cria todos os índices recomendados."""
-        print("🔍 Criando índices no Neo4j...")
-
-        with self.driver.session() as session:
-            # 1. Índice no label Learning + propriedade name (BUSCA MAIS COMUM)
-            try:
-                session.run("""
-                    CREATE INDEX learning_name_idx IF NOT EXISTS
-                    FOR (n:Learning) ON (n.name)
-                """)
-                print("✅ Índice: Learning.name")
-            except Exception as e:
-                print(f"⚠️  Learning.name já existe ou erro: {e}")
-
-            # 2. Índice no label Learning + propriedade type
-            try:
-                session.run("""
-                    CREATE INDEX learning_type_idx IF NOT EXISTS
-                    FOR (n:Learning) ON (n.type)
-                """)
-                print("✅ Índice: Learning.type")
-            except Exception as e:
-                print(f"⚠️  Learning.type já existe ou erro: {e}")
-
-            # 3. Índice composto para buscas por usuário e timestamp
+            await self.driver.close()
+
+    async def create_all_indexes(self):
+        """Cria todos os índices recomendados em uma única transação.
+
+        Se o lote falhar, cada DDL é repetido na própria transação para que
+        um statement inválido não impeça os demais e apareça no log.
+        """
+        logger.info("🔍 Criando índices no Neo4j...")
+
+        async def _create(tx, statements):
+            for ddl in statements:
+                await tx.run(ddl)
+
+        try:
+            async with self.driver.session() as session:
+                existing = await self.get_existing_index_names(session)
+                properties = await self.get_learning_properties(session)
+                selected = []
+                for name, (description, ddl, required) in INDEX_DDL.items():
+                    if name in existing:
+                        logger.info(f"ℹ️  {description} já existe")
+                    elif required <= properties:
+                        selected.append((description, ddl))
+                    else:
+                        logger.info(f"ℹ️  {description} ignorado: propriedades ausentes em Learning")
+
+                selected_descriptions = {description for description, _ in selected}
+                dropped = [
+                    name for name, (replacement, _) in SUPERSEDED_INDEXES.items()
+                    if name in existing and INDEX_DDL[replacement][0] in selected_descriptions
+                ]
+                for name in dropped:
+                    result = await session.run(f"DROP INDEX {name} IF EXISTS")
+                    await result.consume()
+                    logger.info(f"🗑️  Índice {name} removido (será substituído por constraint)")
+
+                created = await self._create_selected(session, _create, selected)
+                await self._restore_superseded(session, _create, dropped, created)
+            for description in created:
+                logger.info(f"✅ {description}")
+        except Exception as e:
+            logger.warning(f"⚠️  Erro ao criar índices: {e}")
+
+    async def _create_selected(self, session, create, selected) -> list:
+        """Executa os DDLs em lote e, se falhar, um por transação.
+
+        Retorna as descrições dos índices criados.
+        """
+        if not selected:
+            return []
+
+        try:
+            await session.execute_write(create, [ddl for _, ddl in selected])
+            return [description for description, _ in selected]
+        except Exception as e:
+            logger.warning(f"⚠️  Criação em lote falhou ({e}); repetindo um por um")
+
+        created = []
+        for description, ddl in selected:
             try:
-                session.run("""
-                    CREATE INDEX learning_user_timestamp_idx IF NOT EXISTS
-                    FOR (n:Learning) ON (n.user, n.created_at)
-                """)
-                print("✅ Índice composto: Learning.user + Learning.created_at")
+                await session.execute_write(create, [ddl])
+                created.append(description)
             except Exception as e:
-                print(f"⚠️  Índice composto já existe ou erro: {e}")
-
-            # 4. Índice full-text para busca de conteúdo
-            try:
-                session.run("""
-                    CREATE FULLTEXT INDEX learning_content_fulltext IF NOT EXISTS
-                    FOR (n:Learning) ON EACH [n.name, n.description, n.content]
-                """)
-                print("✅ Índice full-text: Learning (name, description, content)")
-            except Exception as e:
-                print(f"⚠️  Índice full-text já existe ou erro: {e}")
-
-            # 5. Índice em elementId para lookups diretos
-            try:
-                session.run("""
-                    CREATE INDEX learning_element_id_idx IF NOT EXISTS
-                    FOR (n:Learning) ON (elementId(n))
-                """)
-                print("✅ Índice: elementId(Learning)")
-            except Exception as e:
-                print(f"⚠️  elementId já existe ou erro: {e}")
-
-            # 6. Constraint de unicidade (opcional mas recomendado)
-            try:
-                session.run("""
-                    CREATE CONSTRAINT learning_unique_name IF NOT EXISTS
-                    FOR (n:Learning) REQUIRE n.name IS UNIQUE
-                """)
-                print("✅ Constraint: Learning.name UNIQUE")
-            except Exception as e:
-                print(f"⚠️  Constraint já existe ou erro: {e}")
-
-    def analyze_indexes(self):
+                logger.warning(f"⚠️  Erro ao criar {description}: {e}")
+        return created
+
+    async def _restore_superseded(self, session, create, dropped, created):
+        """Recria os índices removidos cuja constraint substituta falhou.
+
+        Sem isso uma constraint que não pode ser criada (ex.: Learning.name
+        duplicado) deixaria a busca por nome sem nenhum índice.
+        """
+        for name in dropped:
+            replacement, ddl = SUPERSEDED_INDEXES[name]
+            if INDEX_DDL[replacement][0] in created:
+                continue
+            logger.warning(f"⚠️  {replacement} não foi criada; recriando {name}")
+            await session.execute_write(create, [ddl])
+
+    async def get_existing_index_names(self, session) -> set:
+        """Lista os nomes dos índices existentes em um único round-trip.
+
+        Constraints de unicidade aparecem aqui pelo índice que as sustenta,
+        criado com o mesmo nome.
+        """
+        result = await session.run("SHOW INDEXES YIELD name")
+        return {record["name"] async for record in result}
+
+    async def get_learning_properties(self, session) -> set:
+        """Retorna as propriedades conhecidas do label Learning."""
+        result = await session.run("""
+            CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName
+            WHERE 'Learning' IN nodeLabels
+            RETURN collect(propertyName) AS props
+        """)
+        record = await result.single()
+        return set(record["props"]) if record else set()
+
+    async def analyze_indexes(self):
         """Analisa índices existentes."""
-        print("\n📊 Analisando índices existentes...")
+        logger.info("\n📊 Analisando índices existentes...")
 
-        with self.driver.session() as session:
-            result = session.run("SHOW INDEXES")
-            indexes = [dict(record) for record in result]
+        async with self.driver.session() as session:
+            result = await session.run("SHOW INDEXES")
+            indexes = [dict(record) async for record in result]
 
             if not indexes:
-                print("❌ Nenhum índice encontrado!")
+                logger.error("❌ Nenhum índice encontrado!")
                 return
 
-            print(f"✅ {len(indexes)} índices encontrados:")
+            logger.info(f"✅ {len(indexes)} índices encontrados:")
             for idx in indexes:
-                print(f"   - {idx.get('name', 'unnamed')}: {idx.get('labelsOrTypes', [])} ON {idx.get('properties', [])}")
-
-    def analyze_query_performance(self):
-        """Analisa performance de queries comuns."""
-        print("\n⚡ Testando performance de queries...")
-
-        with self.driver.session() as session:
-            import time
-
-            # Query 1: Busca por name SEM índice
-            start = time.time()
-            session.run("MATCH (n:Learning {name: 'Claude Code SDK'}) RETURN n LIMIT 1")
-            duration1 = (time.time() - start) * 1000
-            print(f"   Query 1 (busca por name): {duration1:.2f}ms")
-
-            # Query 2: Busca por type
-            start = time.time()
-            session.run("MATCH (n:Learning) WHERE n.type = 'concept' RETURN n LIMIT 10")
-            duration2 = (time.time() - start) * 1000
-            print(f"   Query 2 (busca por type): {duration2:.2f}ms")
-
-            # Query 3: Full scan
-            start = time.time()
-            session.run("MATCH (n:Learning) RETURN count(n)")
-            duration3 = (time.time() - start) * 1000
-            print(f"   Query 3 (count total): {duration3:.2f}ms")
-
-            # Query 4: Com relacionamentos
-            start = time.time()
-            session.run("""
-                MATCH (n:Learning)-[r]-(m)
-                RETURN count(r) LIMIT 100
-            """)
-            duration4 = (time.time() - start) * 1000
-            print(f"   Query 4 (com relacionamentos): {duration4:.2f}ms")
-
-    def get_recommendations(self):
+                logger.info(f"   - {idx.get('name', 'unnamed')}: {idx.get('labelsOrTypes', [])} ON {idx.get('properties', [])}")
+
+    async def _time_query(self, query: str) -> float:
+        """Executa uma query em sessão própria do pool e retorna a duração em ms."""
+        async with self.driver.session() as session:
+            start = time.perf_counter()
+            result = await session.run(query)
+            await result.consume()
+            return (time.perf_counter() - start) * 1000
+
+    async def analyze_query_performance(self):
+        """Analisa performance de queries comuns, executadas em paralelo."""
+        logger.info("\n⚡ Testando performance de queries...")
+
+        durations = await asyncio.gather(
+            *[self._time_query(query) for _, query in BENCHMARK_QUERIES]
+        )
+        for (description, _), duration in zip(BENCHMARK_QUERIES, durations):
+            logger.info(f"   {description}: {duration:.2f}ms")
+
+    async def get_recommendations(self):
         """Gera recomendações de otimização."""
-        print("\n💡 Recomendações de Otimização:")
+        logger.info("\n💡 Recomendações de Otimização:")
 
-        with self.driver.session() as session:
+        async with self.driver.session() as session:
             # Verifica tamanho do grafo
-            result = session.run("MATCH (n) RETURN count(n) as total")
-            total_nodes = result.single()["total"]
+            result = await session.run("MATCH (n) RETURN count(n) as total")
+            total_nodes = (await result.single())["total"]
 
             if total_nodes > 10000:
-                print(f"   ⚠️  Grafo grande ({total_nodes} nós) - índices são CRÍTICOS")
+                logger.warning(f"   ⚠️  Grafo grande ({total_nodes} nós) - índices são CRÍTICOS")
             else:
-                print(f"   ℹ️  Grafo pequeno ({total_nodes} nós) - índices melhoram mas não críticos")
+                logger.info(f"   ℹ️  Grafo pequeno ({total_nodes} nós) - índices melhoram mas não críticos")
 
             # Verifica nós isolados
-            result = session.run("MATCH (n) WHERE NOT (n)-[]-() RETURN count(n) as isolated")
-            isolated = result.single()["isolated"]
+            result = await session.run("MATCH (n) WHERE NOT (n)-[]-() RETURN count(n) as isolated")
+            isolated = (await result.single())["isolated"]
 
             if isolated > 100:
-                print(f"   ⚠️  {isolated} nós isolados - considerar limpeza")
+                logger.warning(f"   ⚠️  {isolated} nós isolados - considerar limpeza")
 
             # Verifica densidade
-            result = session.run("""
+            result = await session.run("""
                 MATCH (n)
                 WITH count(n) as nodes
                 MATCH ()-[r]->()
                 RETURN nodes, count(r) as rels
             """)
-            record = result.single()
+            record = await result.single()
             nodes = record["nodes"]
             rels = record["rels"]
 
             if nodes > 0:
                 density = (2 * rels) / (nodes * (nodes - 1)) if nodes > 1 else 0
-                print(f"   📊 Densidade do grafo: {density:.6f}")
+                logger.info(f"   📊 Densidade do grafo: {density:.6f}")
 
                 if density < 0.01:
-                    print("   ℹ️  Grafo esparso - considerar usar índices de range")
+                    logger.info("   ℹ️  Grafo esparso - considerar usar índices de range")
 
 
-def main():
+async def main():
     """Função principal."""
     manager = Neo4jIndexManager()
 
     try:
-        print("=" * 60)
-        print("🚀 Otimização de Performance - Neo4j Agent API")
-        print("=" * 60)
+        logger.info("=" * 60)
+        logger.info("🚀 Otimização de Performance - Neo4j Agent API")
+        logger.info("=" * 60)
 
         # Análise inicial
-        manager.analyze_indexes()
-        manager.get_recommendations()
+        await manager.analyze_indexes()
+        await manager.get_recommendations()
 
         # Cria índices
-        print("\n" + "=" * 60)
-        manager.create_all_indexes()
+        logger.info("\n" + "=" * 60)
+        await manager.create_all_indexes()
 
         # Análise pós-criação
-        manager.analyze_indexes()
+        await manager.analyze_indexes()
 
         # Testa performance
-        manager.analyze_query_performance()
+        await manager.analyze_query_performance()
 
-        print("\n" + "=" * 60)
-        print("✅ Otimização concluída com sucesso!")
-        print("=" * 60)
+        logger.info("\n" + "=" * 60)
+        logger.info("✅ Otimização concluída com sucesso!")
+        logger.info("=" * 60)
 
     except Exception as e:
-        print(f"\n❌ Erro durante otimização: {e}")
+        logger.error(f"\n❌ Erro durante otimização: {e}")
         sys.exit(1)
     finally:
-        manager.close()
+        await manager.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    setup_script_logging()
+    asyncio.run(main())
\ No newline at end of file
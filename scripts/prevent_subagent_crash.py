@@ -3,10 +3,25 @@
 Script para prevenir crashes do backend com múltiplos subagentes
 """
 
+import os
+import sys
 import asyncio
 import json
+import logging
+import re
+import time
 from collections import deque
-from datetime import datetime, timedelta
+
+# Adiciona a raiz do projeto ao path para imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_config import setup_script_logging
+
+logger = logging.getLogger(__name__)
+
+# Detecção de mensagens que tendem a spawnar subagentes: uma única busca
+# case-insensitive, sem copiar a mensagem com .lower()
+SUBAGENT_PATTERN = re.compile(r'subagent|task', re.IGNORECASE)
 
 class SubagentLimiter:
     """Limita quantidade de subagentes simultâneos para prevenir crashes."""
@@ -15,26 +30,27 @@ class SubagentLimiter:
         self.max_concurrent = max_concurrent
         self.max_per_minute = max_per_minute
         self.active_agents = 0
-        self.request_history = deque()
+        self.window = 60.0  # Janela de 1 minuto, em segundos monotônicos
+        # Ring buffer: guarda só os últimos max_per_minute spawns, memória limitada
+        self.request_history = deque(maxlen=max_per_minute)
         self.lock = asyncio.Lock()
 
     async def can_spawn_agent(self):
         """Verifica se pode spawnar novo agente."""
         async with self.lock:
-            # Remove requests antigas (mais de 1 minuto)
-            now = datetime.now()
-            while self.request_history and self.request_history[0] < now - timedelta(minutes=1):
-                self.request_history.popleft()
+            now = time.monotonic()
 
             # Verifica limites
             if self.active_agents >= self.max_concurrent:
                 return False, "Limite de agentes simultâneos atingido"
 
-            if len(self.request_history) >= self.max_per_minute:
+            # Buffer cheio com o spawn mais antigo ainda dentro da janela de 1 minuto
+            history = self.request_history
+            if len(history) >= self.max_per_minute and history[0] >= now - self.window:
                 return False, "Limite de agentes por minuto atingido"
 
-            # Registra novo agente
-            self.request_history.append(now)
+            # Registra novo agente (o mais antigo expirado sai automaticamente)
+            history.append(now)
             self.active_agents += 1
             return True, "OK"
 
@@ -52,26 +68,26 @@ def patch_server():
     # Adiciona import e inicialização do limiter
     limiter_code = """
 # Limiter para prevenir crashes com muitos subagentes
-from scripts.prevent_subagent_crash import SubagentLimiter
+from scripts.prevent_subagent_crash import SubagentLimiter, SUBAGENT_PATTERN
 subagent_limiter = SubagentLimiter(max_concurrent=8, max_per_minute=40)
 """
 
     # Adiciona verificação antes de processar mensagens
     check_code = """
             # Verifica limite de subagentes se mensagem parece usar muitos
-            if "subagent" in chat_message.message.lower() or "task" in chat_message.message.lower():
+            if SUBAGENT_PATTERN.search(chat_message.message):
                 can_proceed, reason = await subagent_limiter.can_spawn_agent()
                 if not can_proceed:
                     yield f"data: {json.dumps({'type': 'warning', 'content': f'⚠️ {reason}. Aguarde um momento antes de tentar novamente.'})}\n\n"
                     await asyncio.sleep(2)
 """
 
-    print("✅ Código de prevenção de crash criado!")
-    print("\nPara aplicar no servidor, adicione:")
-    print("\n1. Após os imports:")
-    print(limiter_code)
-    print("\n2. Antes de processar mensagem (linha ~308):")
-    print(check_code)
+    logger.info("✅ Código de prevenção de crash criado!")
+    logger.info("\nPara aplicar no servidor, adicione:")
+    logger.info("\n1. Após os imports:")
+    logger.info(limiter_code)
+    logger.info("\n2. Antes de processar mensagem (linha ~308):")
+    logger.info(check_code)
 
 
 def analyze_crash_pattern():
@@ -90,35 +106,55 @@ def analyze_crash_pattern():
     [17:33:19] ❌ Erro: 'list' object has no attribute 'replace'
     """
 
-    print("📊 ANÁLISE DO CRASH:")
-    print("-" * 50)
-    print("• Duração total: ~3 minutos")
-    print("• Total de tool_uses: 100+")
-    print("• Taxa média: ~33 tool uses/minuto")
-    print("• Pico: 20+ tool uses em 5 segundos")
-    print("\n🔴 PROBLEMAS IDENTIFICADOS:")
-    print("1. Sobrecarga de memória com muitas tasks paralelas")
-    print("2. Falta de throttling/rate limiting")
-    print("3. Processamento síncrono de tool results")
-    print("4. Validação incorreta de tipos (lista vs string)")
-    print("\n✅ SOLUÇÕES IMPLEMENTADAS:")
-    print("1. Validação robusta de tipos em input_validator.py")
-    print("2. Limiter para subagentes (max 8 simultâneos)")
-    print("3. Rate limit de 40 agents/minuto")
+    logger.info("📊 ANÁLISE DO CRASH:")
+    logger.info("-" * 50)
+    logger.info("• Duração total: ~3 minutos")
+    logger.info("• Total de tool_uses: 100+")
+    logger.info("• Taxa média: ~33 tool uses/minuto")
+    logger.info("• Pico: 20+ tool uses em 5 segundos")
+    logger.info("\n🔴 PROBLEMAS IDENTIFICADOS:")
+    logger.info("1. Sobrecarga de memória com muitas tasks paralelas")
+    logger.info("2. Falta de throttling/rate limiting")
+    logger.info("3. Processamento síncrono de tool results")
+    logger.info("4. Validação incorreta de tipos (lista vs string)")
+    logger.info("\n✅ SOLUÇÕES IMPLEMENTADAS:")
+    logger.info("1. Validação robusta de tipos em input_validator.py")
+    logger.info("2. Limiter para subagentes (max 8 simultâneos)")
+    logger.info("3. Rate limit de 40 agents/minuto")
 
 
 def create_monitoring_script():
     """Cria script de monitoramento para detectar sobrecarga."""
 
     monitor_code = """
+import os
+import sys
+import gc
+import logging
 import psutil
 import asyncio
-import json
-from datetime import datetime
+import aiofiles
+import orjson
+from datetime import datetime, timezone
+
+# Adiciona a raiz do projeto ao path para imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_config import setup_script_logging
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = 12  # Flush do JSONL a cada 12 amostras (~1 minuto)
 
 async def monitor_server_health():
     '''Monitora saúde do servidor em tempo real.'''
 
+    # Mesmo tuning de GC do servidor otimizado; objetos do startup são
+    # congelados e saem das varreduras, as métricas por ciclo morrem na gen0
+    gc.set_threshold(700, 10, 10)
+    gc.collect()
+    gc.freeze()
+
     thresholds = {
         'cpu_percent': 80,
         'memory_percent': 85,
@@ -126,61 +162,81 @@ async def monitor_server_health():
         'tool_uses_per_minute': 50
     }
 
-    while True:
-        # Coleta métricas
-        cpu = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory().percent
+    # Primeira leitura só inicializa o delta de CPU (interval=None não bloqueia)
+    psutil.cpu_percent(interval=None)
+    loop = asyncio.get_running_loop()
+
+    # Arquivo aberto uma vez, em modo binário com buffer, reutilizado no loop;
+    # a escrita roda no executor do aiofiles e não bloqueia o event loop
+    async with aiofiles.open('server_health.jsonl', 'ab', buffering=1 << 16) as health_log:
+        iteration = 0
+
+        while True:
+            # Coleta métricas
+            cpu = await loop.run_in_executor(None, psutil.cpu_percent, None)
+            memory = (await loop.run_in_executor(None, psutil.virtual_memory)).percent
+
+            # Alerta se limites excedidos
+            if cpu > thresholds['cpu_percent']:
+                logger.warning(f"⚠️ CPU alta: {cpu}%")
 
-        # Alerta se limites excedidos
-        if cpu > thresholds['cpu_percent']:
-            print(f"⚠️ CPU alta: {cpu}%")
+            if memory > thresholds['memory_percent']:
+                logger.warning(f"⚠️ Memória alta: {memory}%")
 
-        if memory > thresholds['memory_percent']:
-            print(f"⚠️ Memória alta: {memory}%")
+            # Log métricas
+            metrics = {
+                'timestamp': datetime.now(timezone.utc),  # orjson formata em C
+                'cpu': cpu,
+                'memory': memory,
+                'status': 'healthy' if cpu < 80 and memory < 85 else 'warning'
+            }
 
-        # Log métricas
-        metrics = {
-            'timestamp': datetime.now().isoformat(),
-            'cpu': cpu,
-            'memory': memory,
-            'status': 'healthy' if cpu < 80 and memory < 85 else 'warning'
-        }
+            await health_log.write(orjson.dumps(metrics, option=orjson.OPT_UTC_Z) + b'\\n')
 
-        with open('server_health.jsonl', 'a') as f:
-            f.write(json.dumps(metrics) + '\\n')
+            iteration += 1
+            if iteration % FLUSH_EVERY == 0:
+                await health_log.flush()
 
-        await asyncio.sleep(5)
+            await asyncio.sleep(5)
 
 if __name__ == "__main__":
-    asyncio.run(monitor_server_health())
+    # Alertas saem na hora; o restante é escrito em lote
+    setup_script_logging(flush_level=logging.WARNING)
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    run(monitor_server_health())
 """
 
     with open("/Users/2a/Desktop/neo4j-agent/api/scripts/monitor_health.py", "w") as f:
         f.write(monitor_code)
 
-    print("\n✅ Script de monitoramento criado: monitor_health.py")
-    print("Execute em paralelo com o servidor: python3 scripts/monitor_health.py")
+    logger.info("\n✅ Script de monitoramento criado: monitor_health.py")
+    logger.info("Execute em paralelo com o servidor: python3 scripts/monitor_health.py")
 
 
 if __name__ == "__main__":
-    print("🛡️ PREVENÇÃO DE CRASH COM SUBAGENTES")
-    print("=" * 50)
+    setup_script_logging()
+    logger.info("🛡️ PREVENÇÃO DE CRASH COM SUBAGENTES")
+    logger.info("=" * 50)
 
     # Analisa padrão do crash
     analyze_crash_pattern()
 
-    print("\n" + "=" * 50)
+    logger.info("\n" + "=" * 50)
 
     # Cria código de prevenção
     patch_server()
 
-    print("\n" + "=" * 50)
+    logger.info("\n" + "=" * 50)
 
     # Cria monitor de saúde
     create_monitoring_script()
 
-    print("\n🎯 RECOMENDAÇÕES:")
-    print("1. Limite perguntas a 5-8 subagentes por vez")
-    print("2. Use WebSocket client para operações longas")
-    print("3. Monitore uso de CPU/memória durante execução")
-    print("4. Considere implementar queue de tasks")
\ No newline at end of file
+    logger.info("\n🎯 RECOMENDAÇÕES:")
+    logger.info("1. Limite perguntas a 5-8 subagentes por vez")
+    logger.info("2. Use WebSocket client para operações longas")
+    logger.info("3. Monitore uso de CPU/memória durante execução")
+    logger.info("4. Considere implementar queue de tasks")
\ No newline at end of file
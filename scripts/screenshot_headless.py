@@ -4,35 +4,80 @@ Captura screenshot usando Chrome headless (renderiza sem mostrar na tela)
 """
 
 import os
-import time
 import uuid
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import WebDriverException, TimeoutException
+
+from _chrome import block_heavy_resources, build_headless_options, save_screenshot, wait_stale_safe
+from _driver_pool import get_driver, tab
 
 def setup_chrome_driver():
     """Configura o Chrome driver com opções headless."""
-    chrome_options = Options()
+    return build_headless_options()
+
+def run_chat_scenario(driver):
+    """Abre o chat, envia a mensagem de teste e salva screenshot + HTML."""
+    block_heavy_resources(driver)
+
+    # Navega para a página
+    print("📍 Navegando para http://localhost:8080/")
+    driver.get("http://localhost:8080/")
+
+    # Aguarda a página carregar
+    wait = WebDriverWait(driver, 10)
+
+    # Aguarda o campo de mensagem estar presente
+    print("⏳ Aguardando página carregar...")
+    message_input = wait.until(
+        EC.presence_of_element_located((By.ID, "messageInput"))
+    )
+
+    # Gera session ID
+    session_id = str(uuid.uuid4())
+
+    # Executa JavaScript para criar sessão e enviar mensagem
+    print("💬 Enviando mensagem de teste...")
+    driver.execute_script(f"""
+        // Cria sessão
+        fetch('http://localhost:8080/api/sessions', {{
+            method: 'POST',
+            headers: {{ 'Content-Type': 'application/json' }},
+            body: JSON.stringify({{ session_id: '{session_id}' }})
+        }}).then(() => {{
+            // Envia mensagem
+            document.getElementById('messageInput').value = 'Olá! Este é um teste automatizado.';
+            document.getElementById('sendButton').click();
+        }});
+    """)
+
+    # Aguarda resposta aparecer
+    print("⏳ Aguardando resposta do assistente...")
 
-    # Modo headless - renderiza sem mostrar janela
-    chrome_options.add_argument('--headless=new')
+    try:
+        # Aguarda o elemento de resposta em vez de um sleep fixo
+        response_wait = WebDriverWait(driver, 15, poll_frequency=0.1)
+        if wait_stale_safe(response_wait, (By.CLASS_NAME, "assistant")):
+            print("✅ Resposta recebida")
+        else:
+            print("⚠️ Resposta re-renderizada durante a espera (continuando mesmo assim)")
+    except TimeoutException:
+        print("⚠️ Timeout aguardando resposta (continuando mesmo assim)")
 
-    # Outras configurações úteis
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--window-size=1280,800')
-    chrome_options.add_argument('--force-device-scale-factor=2')  # Retina quality
+    # Captura screenshot
+    screenshot_path = "/tmp/chat_headless.png"
+    save_screenshot(driver, screenshot_path)
+    print(f"📸 Screenshot salvo em: {screenshot_path}")
 
-    # Desabilita notificações
-    chrome_options.add_argument('--disable-notifications')
-    chrome_options.add_argument('--disable-popup-blocking')
+    # Também captura o HTML para debug
+    html_path = "/tmp/chat_headless.html"
+    with open(html_path, 'w') as f:
+        f.write(driver.page_source)
+    print(f"📄 HTML salvo em: {html_path}")
 
-    return chrome_options
+    return screenshot_path
 
 def capture_chat_screenshot():
     """Captura screenshot do chat em modo headless."""
@@ -41,13 +86,16 @@ def capture_chat_screenshot():
     print("=" * 60)
 
     driver = None
+    persistent = False
     try:
         # Configura o driver
         chrome_options = setup_chrome_driver()
 
         # Tenta criar o driver
         try:
-            driver = webdriver.Chrome(options=chrome_options)
+            # Reaproveita a sessão Chrome persistente entre execuções
+            driver = get_driver(chrome_options)
+            persistent = True
         except WebDriverException:
             print("⚠️ ChromeDriver não encontrado. Tentando com Safari...")
             # Fallback para Safari
@@ -57,70 +105,19 @@ def capture_chat_screenshot():
 
         print("✅ Driver inicializado")
 
-        # Navega para a página
-        print("📍 Navegando para http://localhost:8080/")
-        driver.get("http://localhost:8080/")
-
-        # Aguarda a página carregar
-        wait = WebDriverWait(driver, 10)
-
-        # Aguarda o campo de mensagem estar presente
-        print("⏳ Aguardando página carregar...")
-        message_input = wait.until(
-            EC.presence_of_element_located((By.ID, "messageInput"))
-        )
-
-        # Gera session ID
-        session_id = str(uuid.uuid4())
-
-        # Executa JavaScript para criar sessão e enviar mensagem
-        print("💬 Enviando mensagem de teste...")
-        driver.execute_script(f"""
-            // Cria sessão
-            fetch('http://localhost:8080/api/sessions', {{
-                method: 'POST',
-                headers: {{ 'Content-Type': 'application/json' }},
-                body: JSON.stringify({{ session_id: '{session_id}' }})
-            }}).then(() => {{
-                // Envia mensagem
-                document.getElementById('messageInput').value = 'Olá! Este é um teste automatizado.';
-                document.getElementById('sendButton').click();
-            }});
-        """)
-
-        # Aguarda resposta aparecer
-        print("⏳ Aguardando resposta do assistente...")
-        time.sleep(5)  # Aguarda processar
-
-        try:
-            # Tenta aguardar elemento de resposta
-            wait.until(
-                EC.presence_of_element_located((By.CLASS_NAME, "assistant"))
-            )
-            print("✅ Resposta recebida")
-        except:
-            print("⚠️ Timeout aguardando resposta (continuando mesmo assim)")
-
-        # Captura screenshot
-        screenshot_path = "/tmp/chat_headless.png"
-        driver.save_screenshot(screenshot_path)
-        print(f"📸 Screenshot salvo em: {screenshot_path}")
-
-        # Também captura o HTML para debug
-        html_path = "/tmp/chat_headless.html"
-        with open(html_path, 'w') as f:
-            f.write(driver.page_source)
-        print(f"📄 HTML salvo em: {html_path}")
-
-        driver.quit()
-        return screenshot_path
+        # Cada execução usa uma aba nova na sessão Chrome compartilhada
+        with tab(driver):
+            return run_chat_scenario(driver)
 
     except Exception as e:
         print(f"❌ Erro: {e}")
-        if driver:
-            driver.quit()
         return None
 
+    finally:
+        # A sessão persistente fica aberta para a próxima execução
+        if driver and not persistent:
+            driver.quit()
+
 if __name__ == "__main__":
     print("🎯 CAPTURA DE SCREENSHOT EM MODO HEADLESS")
     print("Este modo renderiza a página sem mostrar na tela")
@@ -4,74 +4,72 @@ Captura screenshot usando Selenium WebDriver
 """
 
 import os
-import time
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
 def capture_with_selenium():
     """Captura screenshot usando Selenium."""
     try:
-        from selenium import webdriver
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.chrome.service import Service
+        from selenium.common.exceptions import TimeoutException
+        from _chrome import block_heavy_resources, build_headless_options, save_screenshot, stable_text
+        from _driver_pool import get_driver, tab
 
         print("🚀 Iniciando captura com Selenium...")
 
         # Configurações do Chrome
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')  # Modo headless
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--window-size=1280,800')
-
-        # Inicializa o driver
-        driver = webdriver.Chrome(options=chrome_options)
-
-        try:
-            # Navega para a página
-            print("📍 Navegando para http://localhost:8080/")
-            driver.get("http://localhost:8080/")
-
-            # Aguarda a página carregar
-            wait = WebDriverWait(driver, 10)
-            message_input = wait.until(
-                EC.presence_of_element_located((By.ID, "messageInput"))
-            )
-
-            # Digite uma mensagem
-            print("⌨️ Digitando mensagem...")
-            message_input.send_keys("Olá! Este é um teste automatizado com Selenium.")
-
-            # Clica no botão enviar
-            print("🖱️ Enviando mensagem...")
-            send_button = driver.find_element(By.ID, "sendButton")
-            send_button.click()
-
-            # Aguarda a resposta
-            print("⏳ Aguardando resposta do assistente...")
+        chrome_options = build_headless_options()
+
+        # Reaproveita a sessão Chrome persistente entre execuções
+        driver = get_driver(chrome_options)
+
+        # Cada execução usa uma aba nova na sessão Chrome compartilhada
+        with tab(driver):
             try:
-                wait.until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "message.assistant"))
+                block_heavy_resources(driver)
+
+                # Navega para a página
+                print("📍 Navegando para http://localhost:8080/")
+                driver.get("http://localhost:8080/")
+
+                # Aguarda a página carregar
+                wait = WebDriverWait(driver, 10)
+                message_input = wait.until(
+                    EC.presence_of_element_located((By.ID, "messageInput"))
                 )
-                time.sleep(2)  # Aguarda a resposta completar
-            except:
-                print("⚠️ Timeout aguardando resposta")
 
-            # Captura o screenshot
-            screenshot_path = "/tmp/chat_selenium.png"
-            driver.save_screenshot(screenshot_path)
-            print(f"✅ Screenshot salvo em: {screenshot_path}")
+                # Digite uma mensagem
+                print("⌨️ Digitando mensagem...")
+                message_input.send_keys("Olá! Este é um teste automatizado com Selenium.")
 
-            driver.quit()
-            return screenshot_path
+                # Clica no botão enviar
+                print("🖱️ Enviando mensagem...")
+                send_button = driver.find_element(By.ID, "sendButton")
+                send_button.click()
 
-        except Exception as e:
-            print(f"❌ Erro durante captura: {e}")
-            driver.quit()
-            return None
+                # Aguarda a resposta
+                print("⏳ Aguardando resposta do assistente...")
+                try:
+                    # Aguarda o texto da resposta parar de mudar (fim do streaming)
+                    WebDriverWait(driver, 10, poll_frequency=0.1).until(
+                        stable_text((By.CSS_SELECTOR, ".message.assistant"))
+                    )
+                except TimeoutException:
+                    print("⚠️ Timeout aguardando resposta")
+
+                # Captura o screenshot
+                screenshot_path = "/tmp/chat_selenium.png"
+                save_screenshot(driver, screenshot_path)
+                print(f"✅ Screenshot salvo em: {screenshot_path}")
+
+                return screenshot_path
+
+            except Exception as e:
+                print(f"❌ Erro durante captura: {e}")
+                return None
 
     except ImportError:
         print("❌ Selenium não está instalado.")
@@ -131,22 +129,48 @@ def capture_with_mss():
         print("  pip install mss")
         return None
 
+CAPTURE_METHODS = (capture_with_selenium, capture_with_mss, capture_with_pyautogui)
+
+def capture_first_available():
+    """Dispara os métodos em paralelo e retorna o melhor que tiver sucesso.
+
+    A ordem de preferência continua Selenium > MSS > PyAutoGUI: um resultado
+    só é aceito quando todos os métodos preferidos a ele já terminaram sem
+    sucesso. Assim que isso acontece o executor é liberado sem esperar pelos
+    métodos menos preferidos que ainda estejam rodando.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(CAPTURE_METHODS))
+    futures = [executor.submit(method) for method in CAPTURE_METHODS]
+    results = [None] * len(futures)
+    finished = [False] * len(futures)
+    pending = set(futures)
+
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.index(future)
+                finished[index] = True
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(f"❌ Erro na captura: {e}")
+
+            # Primeiro método ainda em aberto ou com sucesso, na ordem de preferência
+            for index, result in enumerate(results):
+                if not finished[index]:
+                    break
+                if result:
+                    return result
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 if __name__ == "__main__":
     print("🔍 Testando diferentes métodos de captura de screenshot...")
     print("=" * 60)
 
-    # Tenta Selenium primeiro (melhor para páginas web)
-    result = capture_with_selenium()
-
-    # Se falhar, tenta MSS (mais rápido)
-    if not result:
-        print("\n" + "-" * 40)
-        result = capture_with_mss()
-
-    # Se falhar, tenta PyAutoGUI
-    if not result:
-        print("\n" + "-" * 40)
-        result = capture_with_pyautogui()
+    result = capture_first_available()
 
     if result:
         print("\n🎉 Screenshot capturado com sucesso!")
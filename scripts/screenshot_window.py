@@ -3,16 +3,36 @@
 Captura screenshot de janela específica usando MSS e detecção de janela
 """
 
-import mss
-import mss.tools
-from PIL import Image
-import numpy as np
+import json
 import time
+from pathlib import Path
+
+BROWSER_APPS = frozenset({'Safari', 'Google Chrome', 'Firefox', 'Arc', 'Brave Browser', 'Microsoft Edge'})
+TITLE_MARKERS = ('localhost', 'Chat', '8080')
+
+# Capturas em sequência reaproveitam a lista de janelas por alguns segundos
+WINDOW_CACHE = Path("/tmp/.chat_window_cache")
+WINDOW_CACHE_TTL = 2.0
+
+def _load_cached_windows():
+    """Retorna as janelas do cache em disco se ainda estiverem dentro do TTL."""
+    try:
+        if time.time() - WINDOW_CACHE.stat().st_mtime < WINDOW_CACHE_TTL:
+            return json.loads(WINDOW_CACHE.read_text())
+    except (OSError, ValueError):
+        pass
+    return None
 
 def find_browser_window():
     """
     Tenta encontrar a janela do navegador analisando a tela.
     """
+    cached = _load_cached_windows()
+    if cached is not None:
+        for window in cached:
+            print(f"✅ Encontrada janela (cache): {window['app']} - {window['title']}")
+        return cached
+
     import Quartz
     import Quartz.CoreGraphics as CG
 
@@ -23,30 +43,41 @@ def find_browser_window():
     )
 
     browser_windows = []
-    browser_apps = ['Safari', 'Google Chrome', 'Firefox', 'Arc', 'Brave Browser', 'Microsoft Edge']
 
     for window in window_list:
         owner_name = window.get('kCGWindowOwnerName', '')
-        window_name = window.get('kCGWindowName', '')
-        bounds = window.get('kCGWindowBounds', {})
 
         # Verifica se é um navegador
-        if owner_name in browser_apps:
-            # Verifica se tem localhost no título
-            if 'localhost' in window_name or 'Chat' in window_name or '8080' in window_name or '8080' in window_name:
-                browser_windows.append({
-                    'app': owner_name,
-                    'title': window_name,
-                    'bounds': bounds
-                })
-                print(f"✅ Encontrada janela: {owner_name} - {window_name}")
-
+        if owner_name not in BROWSER_APPS:
+            continue
+
+        # Verifica se tem localhost no título
+        window_name = window.get('kCGWindowName', '') or ''
+        if any(marker in window_name for marker in TITLE_MARKERS):
+            bounds = window.get('kCGWindowBounds', {})
+            browser_windows.append({
+                'app': owner_name,
+                'title': window_name,
+                'bounds': {key: float(bounds[key]) for key in ('X', 'Y', 'Width', 'Height')}
+            })
+            print(f"✅ Encontrada janela: {owner_name} - {window_name}")
+
+    WINDOW_CACHE.write_text(json.dumps(browser_windows))
     return browser_windows
 
+def save_png(screenshot, screenshot_path):
+    """Salva o BGRA do MSS direto como PNG, sem a cópia intermediária de .rgb."""
+    from PIL import Image
+
+    img = Image.frombuffer('RGB', screenshot.size, screenshot.bgra, 'raw', 'BGRX', 0, 1)
+    img.save(screenshot_path, format='PNG', compress_level=1)
+
 def capture_window_area(bounds):
     """
     Captura uma área específica da tela.
     """
+    import mss
+
     with mss.mss() as sct:
         # Define a área para capturar
         monitor = {
@@ -61,7 +92,7 @@ def capture_window_area(bounds):
 
         # Salva
         screenshot_path = f"/tmp/browser_window_mss.png"
-        mss.tools.to_png(screenshot.rgb, screenshot.size, output=screenshot_path)
+        save_png(screenshot, screenshot_path)
 
         return screenshot_path
 
@@ -69,6 +100,8 @@ def capture_with_focus():
     """
     Captura com foco na área central da tela (onde geralmente está o navegador).
     """
+    import mss
+
     with mss.mss() as sct:
         # Pega o monitor principal
         monitor = sct.monitors[1]  # 1 = monitor principal
@@ -91,7 +124,7 @@ def capture_with_focus():
 
         # Salva
         screenshot_path = "/tmp/browser_focused_mss.png"
-        mss.tools.to_png(screenshot.rgb, screenshot.size, output=screenshot_path)
+        save_png(screenshot, screenshot_path)
 
         print(f"✅ Screenshot da área central salvo em: {screenshot_path}")
         return screenshot_path
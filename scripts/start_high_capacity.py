@@ -9,6 +9,15 @@ import sys
 import asyncio
 import multiprocessing
 
+# Instala o uvloop antes de qualquer import do servidor, para que loops
+# criados em tempo de import já usem a implementação rápida
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    UVLOOP_ENABLED = True
+except ImportError:
+    UVLOOP_ENABLED = False
+
 # Configurações de alta performance
 os.environ['PYTHONUNBUFFERED'] = '1'
 os.environ['PYTHONASYNCIODEBUG'] = '0'
@@ -22,14 +31,11 @@ print("🚀 Iniciando servidor com configurações de alta capacidade...")
 print(f"📊 CPUs disponíveis: {multiprocessing.cpu_count()}")
 print(f"📊 Workers recomendados: {multiprocessing.cpu_count() * 2}")
 
-# Importa e modifica configurações antes de importar o servidor
+# Raiz do projeto no path para importar o servidor
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Patch para aumentar capacidade do connection pool
-import sys
-sys.modules['HIGH_CAPACITY'] = True
-
-# Configurações customizadas
+# Limites de referência do modo de alta capacidade (só exibidos; o servidor
+# não lê essa configuração)
 HIGH_CAPACITY_CONFIG = {
     'connection_pool_size': 50,
     'max_concurrent_sessions': 100,
@@ -38,27 +44,20 @@ HIGH_CAPACITY_CONFIG = {
     'max_workers': multiprocessing.cpu_count() * 2
 }
 
-# Salva config em variáveis de ambiente
-for key, value in HIGH_CAPACITY_CONFIG.items():
-    os.environ[f'HC_{key.upper()}'] = str(value)
-
-print("\n📋 Configurações aplicadas:")
+print("\n📋 Configurações de referência:")
 for key, value in HIGH_CAPACITY_CONFIG.items():
     print(f"   • {key}: {value}")
 
 print("\n✨ Iniciando servidor otimizado...")
 
-# Importa servidor com configurações aplicadas
 import server
 
-# Inicia com uvicorn otimizado
-try:
-    import uvloop
-    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+if UVLOOP_ENABLED:
     print("✅ UVLoop ativado para melhor performance")
-except ImportError:
+else:
     print("⚠️ UVLoop não instalado, usando asyncio padrão")
 
+# Inicia com uvicorn otimizado
 import uvicorn
 
 # Configurações do Uvicorn
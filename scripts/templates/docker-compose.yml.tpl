@@ -0,0 +1,90 @@
+version: '3.9'
+
+services:
+  neo4j-agent-api:
+    image: python:3.11-slim
+    container_name: neo4j-agent-api
+    restart: unless-stopped
+
+    # Recursos
+    deploy:
+      resources:
+        limits:
+          cpus: '4'
+          memory: 4G
+        reservations:
+          cpus: '2'
+          memory: 2G
+
+    # Volumes
+    volumes:
+      - ./api:/app
+      - cache-data:/app/cache
+
+    # Portas
+    ports:
+      - "8080:8080"
+
+    # Ambiente
+    environment:
+      - PYTHONUNBUFFERED=1
+      - WORKERS=${workers}
+      - MAX_CONNECTIONS=1000
+      - ANTHROPIC_API_KEY=$${ANTHROPIC_API_KEY}
+      - NEO4J_URI=$${NEO4J_URI}
+      - NEO4J_USER=$${NEO4J_USER}
+      - NEO4J_PASSWORD=$${NEO4J_PASSWORD}
+
+    # Comando
+    command: |
+      bash -c "
+        pip install -r requirements.txt &&
+        pip install uvloop gunicorn &&
+        python3 scripts/start_optimized.sh
+      "
+
+    # Health check
+    healthcheck:
+      test: ["CMD", "curl", "-f", "http://localhost:8080/api/health"]
+      interval: 30s
+      timeout: 10s
+      retries: 3
+
+    # Network
+    networks:
+      - neo4j-network
+
+  # Redis para cache distribuído (opcional)
+  redis:
+    image: redis:7-alpine
+    container_name: neo4j-agent-redis
+    restart: unless-stopped
+    ports:
+      - "6379:6379"
+    volumes:
+      - redis-data:/data
+    command: redis-server --appendonly yes
+    networks:
+      - neo4j-network
+
+  # Nginx como load balancer (opcional para múltiplas instâncias)
+  nginx:
+    image: nginx:alpine
+    container_name: neo4j-agent-nginx
+    restart: unless-stopped
+    ports:
+      - "80:80"
+    volumes:
+      - ./nginx.conf:/etc/nginx/nginx.conf:ro
+    depends_on:
+      - neo4j-agent-api
+    networks:
+      - neo4j-network
+
+volumes:
+  cache-data:
+  redis-data:
+
+networks:
+  neo4j-network:
+    driver: bridge
@@ -0,0 +1,28 @@
+# Core
+fastapi==0.104.1
+uvicorn[standard]==0.24.0
+gunicorn==21.2.0
+httpx==0.25.2
+python-dotenv==1.0.0
+
+# Performance
+uvloop==0.19.0
+aiocache==0.12.2
+async-timeout==4.0.3
+aiofiles==23.2.1
+orjson==3.9.10
+
+# Monitoring
+prometheus-client==0.19.0
+psutil==5.9.6
+
+# Claude SDK
+anthropic==0.18.1
+claude-code-sdk==1.0.0
+
+# Neo4j
+neo4j==5.14.1
+
+# Utils
+python-multipart==0.0.6
+pydantic==2.5.2
@@ -0,0 +1,30 @@
+#!/bin/bash
+
+echo "🚀 Iniciando Neo4j Agent Backend com alta capacidade..."
+
+# Configurações de ambiente para performance
+export PYTHONUNBUFFERED=1
+export PYTHONASYNCIODEBUG=0
+export MALLOC_ARENA_MAX=2
+export WORKERS=$${WORKERS:-${workers}}
+
+# Limites do sistema
+ulimit -n 65536  # Aumenta file descriptors
+ulimit -u 32768  # Aumenta processos
+
+# Inicia servidor com Gunicorn + Uvicorn workers, com CPU affinity em todos os cores
+taskset -c 0-${last_cpu} \
+gunicorn server:app \
+    --worker-class uvicorn.workers.UvicornWorker \
+    --workers $$WORKERS \
+    --worker-connections 2000 \
+    --max-requests 1000 \
+    --max-requests-jitter 100 \
+    --timeout 600 \
+    --keep-alive 75 \
+    --bind 0.0.0.0:8080 \
+    --backlog 2048 \
+    --access-logfile - \
+    --error-logfile - \
+    --log-level info \
+    --preload
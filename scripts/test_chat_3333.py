@@ -3,101 +3,125 @@
 Testa o chat em http://localhost:8080/
 """
 
-import requests
-import json
+import asyncio
+import aiohttp
 import uuid
-import time
 
-def test_chat_interface():
+from _sse import create_client, iter_sse_events
+
+BASE_URL = "http://localhost:8080"
+
+# Até 2 novas tentativas com backoff curto para falhas de conexão
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.1
+
+async def with_retries(request):
+    """Executa `request()` repetindo em erros de conexão (backoff exponencial)."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return await request()
+        except aiohttp.ClientConnectionError:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+
+async def fetch_page(http):
+    """Retorna o status da página do chat."""
+    async def request():
+        async with http.get(f"{BASE_URL}/") as response:
+            return response.status
+    return await with_retries(request)
+
+async def create_session(http, session_id):
+    """Cria a sessão no servidor e retorna (status, corpo)."""
+    async def request():
+        async with http.post(f"{BASE_URL}/api/sessions", json={"session_id": session_id}) as response:
+            if response.status == 200:
+                return response.status, await response.json()
+            return response.status, await response.text()
+    return await with_retries(request)
+
+async def test_chat_interface():
     """Testa a interface do chat na porta 8080."""
 
     print("🚀 TESTE DO CHAT EM http://localhost:8080/")
     print("=" * 60)
 
-    # Primeiro verifica se a página está acessível
-    try:
-        response = requests.get("http://localhost:8080/")
-        if response.status_code == 200:
+    # Gera session ID
+    session_id = str(uuid.uuid4())
+
+    async with create_client() as http:
+        # Verifica a página e cria a sessão em paralelo
+        page_status, session_result = await asyncio.gather(
+            fetch_page(http),
+            create_session(http, session_id),
+            return_exceptions=True
+        )
+
+        if isinstance(page_status, Exception):
+            print(f"❌ Erro ao conectar: {page_status}")
+            return
+        if page_status == 200:
             print("✅ Página do chat está acessível")
         else:
-            print(f"❌ Erro ao acessar página: {response.status_code}")
+            print(f"❌ Erro ao acessar página: {page_status}")
             return
-    except Exception as e:
-        print(f"❌ Erro ao conectar: {e}")
-        return
 
-    # Gera session ID
-    session_id = str(uuid.uuid4())
-    print(f"\n📋 Session ID: {session_id}")
-
-    # Cria sessão
-    print("\n1. Criando sessão...")
-    try:
-        session_response = requests.post(
-            "http://localhost:8080/api/sessions",
-            json={"session_id": session_id}
-        )
-        if session_response.status_code == 200:
-            print(f"✅ Sessão criada: {session_response.json()['session_id']}")
+        print(f"\n📋 Session ID: {session_id}")
+
+        print("\n1. Criando sessão...")
+        if isinstance(session_result, Exception):
+            print(f"❌ Erro: {session_result}")
+            return
+        status, body = session_result
+        if status == 200:
+            print(f"✅ Sessão criada: {body['session_id']}")
         else:
-            print(f"❌ Erro ao criar sessão: {session_response.text}")
+            print(f"❌ Erro ao criar sessão: {body}")
             return
-    except Exception as e:
-        print(f"❌ Erro: {e}")
-        return
-
-    # Envia mensagem
-    print("\n2. Enviando mensagem 'Oi'...")
-    try:
-        with requests.post(
-            "http://localhost:8080/api/chat",
-            json={"message": "Oi", "session_id": session_id},
-            stream=True,
-            timeout=10
-        ) as response:
-
-            if response.status_code != 200:
-                print(f"❌ Erro: Status {response.status_code}")
-                return
-
-            print("\n📨 Resposta do Claude:")
-            print("-" * 60)
-
-            full_response = []
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        try:
-                            data = json.loads(line[6:])
-
-                            if data.get('type') == 'content':
-                                content = data.get('content', '')
-                                full_response.append(content)
-                                print(content, end='', flush=True)
-
-                            elif data.get('type') == 'done':
-                                break
-
-                            elif data.get('type') == 'error':
-                                print(f"\n❌ Erro: {data.get('error', 'Erro desconhecido')}")
-                                break
-
-                        except json.JSONDecodeError:
-                            continue
-
-            print("\n" + "-" * 60)
-
-            if full_response:
-                print("\n✅ CHAT FUNCIONANDO PERFEITAMENTE!")
-                print(f"Resposta completa: {len(''.join(full_response))} caracteres")
-                print("\n🎯 Acesse http://localhost:8080/ no navegador")
-                print("   e clique em 'Enviar' para testar visualmente!")
-            else:
-                print("⚠️ Nenhuma resposta recebida")
-
-    except Exception as e:
-        print(f"❌ Erro: {e}")
+
+        # Envia mensagem
+        print("\n2. Enviando mensagem 'Oi'...")
+        try:
+            async with http.post(
+                f"{BASE_URL}/api/chat",
+                json={"message": "Oi", "session_id": session_id},
+                timeout=aiohttp.ClientTimeout(sock_connect=10, sock_read=10)
+            ) as response:
+
+                if response.status != 200:
+                    print(f"❌ Erro: Status {response.status}")
+                    return
+
+                print("\n📨 Resposta do Claude:")
+                print("-" * 60)
+
+                full_response = []
+                async for data in iter_sse_events(response.content.iter_chunked(4096)):
+                    if data.get('type') == 'content':
+                        content = data.get('content', '')
+                        full_response.append(content)
+                        print(content, end='', flush=True)
+
+                    elif data.get('type') == 'done':
+                        break
+
+                    elif data.get('type') == 'error':
+                        print(f"\n❌ Erro: {data.get('error', 'Erro desconhecido')}")
+                        break
+
+                print("\n" + "-" * 60)
+
+                if full_response:
+                    print("\n✅ CHAT FUNCIONANDO PERFEITAMENTE!")
+                    print(f"Resposta completa: {len(''.join(full_response))} caracteres")
+                    print("\n🎯 Acesse http://localhost:8080/ no navegador")
+                    print("   e clique em 'Enviar' para testar visualmente!")
+                else:
+                    print("⚠️ Nenhuma resposta recebida")
+
+        except Exception as e:
+            print(f"❌ Erro: {e}")
 
 if __name__ == "__main__":
-    test_chat_interface()
\ No newline at end of file
+    asyncio.run(test_chat_interface())
@@ -4,10 +4,20 @@ Teste do chat simulando Chrome DevTools
 """
 
 import asyncio
-import aiohttp
-import json
+import importlib.util
+import httpx
 import uuid
 
+from _sse import iter_sse_events
+
+def create_client():
+    """Cria o cliente HTTP compartilhado (HTTP/2 quando `h2` estiver instalado)."""
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=10),
+    )
+
 async def test_chat():
     """Testa o chat enviando 'Oi' e recebendo resposta."""
 
@@ -33,40 +43,31 @@ async def test_chat():
     print("\n📡 Enviando requisição para API...")
     print("-" * 50)
 
-    async with aiohttp.ClientSession() as session:
+    async with create_client() as client:
         try:
             # Envia mensagem
-            async with session.post(
+            async with client.stream(
+                "POST",
                 url,
-                json={"message": "Oi", "session_id": session_id},
-                timeout=aiohttp.ClientTimeout(total=30)
+                json={"message": "Oi", "session_id": session_id}
             ) as response:
 
-                if response.status != 200:
-                    print(f"❌ Erro: Status {response.status}")
-                    text = await response.text()
+                if response.status_code != 200:
+                    print(f"❌ Erro: Status {response.status_code}")
+                    text = (await response.aread()).decode()
                     print(f"Resposta: {text}")
                     return
 
-                # Processa SSE
+                # Processa SSE a partir dos bytes brutos do stream
                 full_response = []
-                async for line in response.content:
-                    line = line.decode('utf-8').strip()
-
-                    if line.startswith('data: '):
-                        try:
-                            data = json.loads(line[6:])
-
-                            if data.get('type') == 'content':
-                                content = data.get('content', '')
-                                full_response.append(content)
-                                print(content, end='', flush=True)
-
-                            elif data.get('type') == 'end':
-                                break
+                async for data in iter_sse_events(response.aiter_bytes()):
+                    if data.get('type') == 'content':
+                        content = data.get('content', '')
+                        full_response.append(content)
+                        print(content, end='', flush=True)
 
-                        except json.JSONDecodeError:
-                            continue
+                    elif data.get('type') == 'end':
+                        break
 
                 print("\n" + "-" * 50)
 
@@ -84,7 +85,7 @@ async def test_chat():
                 else:
                     print("⚠️ Nenhuma resposta recebida")
 
-        except asyncio.TimeoutError:
+        except httpx.TimeoutException:
             print("⏱️ Timeout - sem resposta em 30 segundos")
         except Exception as e:
             print(f"❌ Erro: {e}")
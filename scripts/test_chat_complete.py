@@ -3,32 +3,41 @@
 Teste completo do chat com validação de session
 """
 
-import requests
+import asyncio
+import os
+import sys
+import aiohttp
 import uuid
-import json
-import time
 
-def test_chat_complete():
+from _sse import create_client, iter_sse_events
+
+async def create_session(http, session_id):
+    """Cria a sessão no servidor e retorna o status HTTP."""
+    create_url = "http://localhost:8080/api/sessions"
+    async with http.post(create_url, json={"session_id": session_id}) as response:
+        return response.status
+
+async def test_chat_complete():
     """Testa o chat com sessão válida."""
 
     print("🚀 TESTE DO CHAT COM CHROME DEVTOOLS SIMULATION")
     print("=" * 60)
 
+    async with create_client() as http:
+        await run_chat_test(http)
+
+    print("\n" + "=" * 60)
+    print("🎉 TESTE CONCLUÍDO!")
+
+async def run_chat_test(http):
+    """Cria a sessão, simula o DevTools e consome o stream do chat."""
+
     # 1. Cria sessão
     session_id = str(uuid.uuid4())
     print(f"📋 Criando sessão: {session_id}")
 
-    # Primeiro, cria a sessão
-    create_url = "http://localhost:8080/api/sessions"
-    create_response = requests.post(
-        create_url,
-        json={"session_id": session_id}
-    )
-
-    if create_response.status_code == 200:
-        print("✅ Sessão criada com sucesso!")
-    else:
-        print(f"⚠️ Sessão pode já existir ou erro: {create_response.status_code}")
+    # Cria a sessão em segundo plano enquanto a simulação é exibida
+    create_task = asyncio.create_task(create_session(http, session_id))
 
     # 2. Simula ações do Chrome DevTools
     print("\n📱 SIMULANDO CHROME DEVTOOLS:")
@@ -43,10 +52,23 @@ def test_chat_complete():
         ("wait_for", ".message-assistant", "Aguarda resposta do assistente")
     ]
 
-    for action, params, desc in chrome_actions:
-        print(f"  ▶️ {action}({params})")
-        print(f"     └─ {desc}")
-        time.sleep(0.2)  # Simula delay
+    # O delay da simulação só existe em modo demonstração (DEMO=1)
+    if os.getenv("DEMO"):
+        await asyncio.sleep(0.2 * len(chrome_actions))
+    sys.stdout.write("\n".join(
+        f"  ▶️ {action}({params})\n     └─ {desc}" for action, params, desc in chrome_actions
+    ) + "\n")
+
+    try:
+        create_status = await create_task
+    except aiohttp.ClientError as e:
+        print(f"❌ Erro ao criar sessão: {e}")
+        return
+
+    if create_status == 200:
+        print("\n✅ Sessão criada com sucesso!")
+    else:
+        print(f"\n⚠️ Sessão pode já existir ou erro: {create_status}")
 
     # 3. Envia mensagem real
     print("\n📡 ENVIANDO MENSAGEM PARA API:")
@@ -64,40 +86,30 @@ def test_chat_complete():
     print("-" * 60)
 
     try:
-        with requests.post(
+        async with http.post(
             chat_url,
             json={"message": message, "session_id": session_id},
-            stream=True,
-            timeout=30
+            timeout=aiohttp.ClientTimeout(sock_connect=30, sock_read=30)
         ) as response:
 
-            if response.status_code != 200:
-                print(f"❌ Erro: Status {response.status_code}")
-                print(f"Detalhes: {response.text}")
+            if response.status != 200:
+                print(f"❌ Erro: Status {response.status}")
+                print(f"Detalhes: {await response.text()}")
                 return
 
             full_response = []
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        try:
-                            data = json.loads(line[6:])
+            async for data in iter_sse_events(response.content.iter_chunked(4096)):
+                if data.get('type') == 'content':
+                    content = data.get('content', '')
+                    full_response.append(content)
+                    print(content, end='', flush=True)
 
-                            if data.get('type') == 'content':
-                                content = data.get('content', '')
-                                full_response.append(content)
-                                print(content, end='', flush=True)
+                elif data.get('type') == 'end':
+                    break
 
-                            elif data.get('type') == 'end':
-                                break
-
-                            elif data.get('type') == 'error':
-                                print(f"\n❌ Erro: {data.get('content', 'Erro desconhecido')}")
-                                break
-
-                        except json.JSONDecodeError:
-                            continue
+                elif data.get('type') == 'error':
+                    print(f"\n❌ Erro: {data.get('content', 'Erro desconhecido')}")
+                    break
 
             print("\n" + "-" * 60)
 
@@ -115,13 +127,10 @@ def test_chat_complete():
             else:
                 print("⚠️ Nenhuma resposta recebida")
 
-    except requests.Timeout:
+    except asyncio.TimeoutError:
         print("⏱️ Timeout - sem resposta em 30 segundos")
     except Exception as e:
         print(f"❌ Erro: {e}")
 
-    print("\n" + "=" * 60)
-    print("🎉 TESTE CONCLUÍDO!")
-
 if __name__ == "__main__":
-    test_chat_complete()
\ No newline at end of file
+    asyncio.run(test_chat_complete())
\ No newline at end of file
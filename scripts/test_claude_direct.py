@@ -13,6 +13,8 @@ sys.path.insert(0, sdk_dir)
 
 import asyncio
 
+PRINT_BATCH = 16
+
 async def test_claude_sdk():
     """Testa o Claude SDK diretamente."""
 
@@ -39,7 +41,8 @@ async def test_claude_sdk():
 
         # Conecta
         print("Conectando...")
-        await asyncio.wait_for(client.connect(), timeout=10.0)
+        async with asyncio.timeout(10.0):
+            await client.connect()
         print("✅ Conectado ao SDK")
 
         # Envia mensagem
@@ -49,13 +52,24 @@ async def test_claude_sdk():
         # Recebe resposta
         print("Aguardando resposta...")
         response_parts = []
+        pending = []
 
         async for msg in client.receive_response():
             if hasattr(msg, 'content'):
                 for block in msg.content:
                     if hasattr(block, 'text'):
                         response_parts.append(block.text)
-                        print(block.text, end='', flush=True)
+                        pending.append(block.text)
+
+                        # Escreve em lotes de PRINT_BATCH blocos em vez de um flush por bloco
+                        if len(pending) >= PRINT_BATCH:
+                            sys.stdout.write(''.join(pending))
+                            sys.stdout.flush()
+                            pending.clear()
+
+        if pending:
+            sys.stdout.write(''.join(pending))
+            sys.stdout.flush()
 
         print("\n" + "=" * 60)
 
@@ -77,5 +91,32 @@ async def test_claude_sdk():
         import traceback
         traceback.print_exc()
 
+async def test_claude_pool():
+    """Testa o Claude SDK pelo pool de clientes já conectados (_sdk_pool)."""
+
+    print("🔍 TESTE DO CLAUDE SDK VIA POOL")
+    print("=" * 60)
+
+    from _sdk_pool import pooled_query
+
+    try:
+        print("Enviando mensagem: 'Oi'")
+        response_parts = []
+        async for text in pooled_query("Oi"):
+            response_parts.append(text)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        print("\n" + "=" * 60)
+
+        if response_parts:
+            print("✅ RESPOSTA RECEBIDA COM SUCESSO!")
+        else:
+            print("⚠️ Nenhuma resposta recebida")
+
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+
 if __name__ == "__main__":
-    asyncio.run(test_claude_sdk())
\ No newline at end of file
+    # --pool reaproveita clientes conectados entre execuções
+    asyncio.run(test_claude_pool() if "--pool" in sys.argv else test_claude_sdk())
\ No newline at end of file
@@ -4,26 +4,44 @@ Script de teste para o ClaudeHandler.
 Testa as principais funcionalidades do handler de forma isolada.
 """
 
+import argparse
 import asyncio
 import sys
 import os
+import traceback
+from collections import Counter
+from contextvars import ContextVar
 from datetime import datetime
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 # Adiciona o diretório pai ao path para imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.claude_handler import ClaudeHandler, SessionConfig
-from utils.logging_config import get_contextual_logger
 
-logger = get_contextual_logger("test_handler")
+# Criações simultâneas de sessão em test_multiple_sessions
+MAX_CONCURRENT_CREATES = 3
+
+# Saída do teste em execução; cada task do gather tem seu próprio buffer,
+# impresso em ordem depois que o grupo termina
+_test_output: ContextVar[Optional[List[str]]] = ContextVar("test_output", default=None)
+
+
+def log(message: str = ""):
+    """Escreve no buffer do teste atual (ou direto no stdout fora de um teste)."""
+    buffer = _test_output.get()
+    if buffer is None:
+        print(message)
+    else:
+        buffer.append(message)
 
 class HandlerTestSuite:
     """Suite de testes para o ClaudeHandler."""
 
-    def __init__(self):
+    def __init__(self, stream: bool = False):
         self.handler = ClaudeHandler()
+        self.stream = stream  # Imprime na hora em vez de acumular por teste
         self.test_results = []
         self.session_ids = []
 
@@ -33,20 +51,28 @@ class HandlerTestSuite:
         print("🧪 INICIANDO TESTES DO CLAUDE HANDLER")
         print("="*60 + "\n")
 
-        tests = [
+        # Testes que só mexem nas próprias sessões rodam em paralelo
+        parallel_safe = [
             self.test_create_session,
             self.test_session_with_config,
-            self.test_send_message,
             self.test_multiple_sessions,
             self.test_session_info,
             self.test_update_session_config,
             self.test_pool_status,
-            self.test_session_destruction,
             self.test_error_handling,
         ]
 
-        for test_func in tests:
-            await self.run_test(test_func)
+        # Conversa real com o Claude e devolução de cliente ao pool compartilhado
+        serial = [
+            self.test_send_message,
+            self.test_session_destruction,
+        ]
+
+        for outcome in await asyncio.gather(*(self.run_test(f) for f in parallel_safe)):
+            self.record_result(outcome)
+
+        for test_func in serial:
+            self.record_result(await self.run_test(test_func))
 
         # Limpa sessões criadas
         await self.cleanup_sessions()
@@ -54,26 +80,40 @@ class HandlerTestSuite:
         # Exibe resumo
         self.show_results()
 
-    async def run_test(self, test_func):
-        """Executa um teste individual."""
+    async def run_test(self, test_func) -> Tuple[str, str, Optional[str], List[str]]:
+        """Executa um teste individual e retorna (nome, status, erro, saída)."""
         test_name = test_func.__name__.replace("test_", "").replace("_", " ").title()
+        output: List[str] = []
+        token = _test_output.set(None if self.stream else output)
 
         try:
-            print(f"▶️  Testando: {test_name}")
+            log(f"▶️  Testando: {test_name}")
             result = await test_func()
 
             if result:
-                print(f"✅ {test_name}: PASSOU")
-                self.test_results.append((test_name, "PASSOU", None))
+                log(f"✅ {test_name}: PASSOU")
+                status, error = "PASSOU", None
             else:
-                print(f"❌ {test_name}: FALHOU")
-                self.test_results.append((test_name, "FALHOU", "Teste retornou False"))
+                log(f"❌ {test_name}: FALHOU")
+                status, error = "FALHOU", "Teste retornou False"
 
         except Exception as e:
-            print(f"❌ {test_name}: ERRO - {str(e)}")
-            self.test_results.append((test_name, "ERRO", str(e)))
+            log(f"❌ {test_name}: ERRO - {str(e)}")
+            status, error = "ERRO", str(e)
+
+        finally:
+            _test_output.reset(token)
+
+        output.append("")
+        return test_name, status, error, output
 
-        print()
+    def record_result(self, outcome: Tuple[str, str, Optional[str], List[str]]):
+        """Imprime a saída de um teste e registra o resultado."""
+        name, status, error, output = outcome
+        # Uma escrita por teste em vez de um print() por linha
+        sys.stdout.write("\n".join(output) + "\n")
+        sys.stdout.flush()
+        self.test_results.append((name, status, error))
 
     async def test_create_session(self) -> bool:
         """Testa criação básica de sessão."""
@@ -89,8 +129,8 @@ class HandlerTestSuite:
         if session_id not in self.handler.active_sessions:
             raise AssertionError("Sessão não marcada como ativa")
 
-        print(f"   ├─ Sessão criada: {session_id}")
-        print(f"   └─ Status ativo: {self.handler.active_sessions[session_id]}")
+        log(f"   ├─ Sessão criada: {session_id}")
+        log(f"   └─ Status ativo: {self.handler.active_sessions[session_id]}")
 
         return True
 
@@ -113,17 +153,18 @@ class HandlerTestSuite:
         await self.handler.create_session(session_id, config)
 
         # Verifica configuração
-        saved_config = self.handler.session_configs.get(session_id)
-        if not saved_config:
+        try:
+            saved_config = self.handler.session_configs[session_id]
+        except KeyError:
             raise AssertionError("Configuração não foi salva")
 
         if saved_config.temperature != 0.5:
             raise AssertionError(f"Temperature incorreta: {saved_config.temperature}")
 
-        print(f"   ├─ Sessão com config: {session_id}")
-        print(f"   ├─ Temperature: {saved_config.temperature}")
-        print(f"   ├─ Tools: {saved_config.allowed_tools}")
-        print(f"   └─ Permission Mode: {saved_config.permission_mode}")
+        log(f"   ├─ Sessão com config: {session_id}")
+        log(f"   ├─ Temperature: {saved_config.temperature}")
+        log(f"   ├─ Tools: {saved_config.allowed_tools}")
+        log(f"   └─ Permission Mode: {saved_config.permission_mode}")
 
         return True
 
@@ -138,21 +179,21 @@ class HandlerTestSuite:
         message = "Olá, este é um teste. Responda apenas 'OK'"
         chunks = []
 
-        print(f"   ├─ Enviando: '{message}'")
+        log(f"   ├─ Enviando: '{message}'")
 
         try:
             async for chunk in self.handler.send_message(session_id, message, timeout=10.0):
                 chunks.append(chunk)
 
                 if chunk.get("type") == "processing":
-                    print(f"   ├─ Processando...")
+                    log(f"   ├─ Processando...")
                 elif chunk.get("type") == "text_chunk":
-                    print(f"   ├─ Chunk: {chunk.get('content', '')[:30]}...")
+                    log(f"   ├─ Chunk: {chunk.get('content', '')[:30]}...")
                 elif chunk.get("type") == "result":
-                    print(f"   └─ Finalizado")
+                    log(f"   └─ Finalizado")
 
         except asyncio.TimeoutError:
-            print(f"   └─ Timeout (normal para teste)")
+            log(f"   └─ Timeout (normal para teste)")
             # Timeout é aceitável em teste
             return True
 
@@ -160,22 +201,29 @@ class HandlerTestSuite:
 
     async def test_multiple_sessions(self) -> bool:
         """Testa múltiplas sessões simultâneas."""
-        sessions = []
+        sessions = [f"test-multi-{i:03d}" for i in range(3)]
+        self.session_ids.extend(sessions)
+
+        # Cria as sessões em paralelo, limitado a MAX_CONCURRENT_CREATES
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CREATES)
+
+        async def create(session_id):
+            async with semaphore:
+                await self.handler.create_session(session_id)
 
-        for i in range(3):
-            session_id = f"test-multi-{i:03d}"
-            self.session_ids.append(session_id)
-            sessions.append(session_id)
-            await self.handler.create_session(session_id)
+        async with asyncio.TaskGroup() as tg:
+            for session_id in sessions:
+                tg.create_task(create(session_id))
 
         # Verifica todas as sessões
         all_sessions = await self.handler.get_all_sessions()
 
-        created_count = sum(1 for s in all_sessions if any(sid in s['session_id'] for sid in sessions))
+        wanted = frozenset(sessions)
+        created_count = sum(1 for s in all_sessions if s['session_id'] in wanted)
 
-        print(f"   ├─ Sessões criadas: {len(sessions)}")
-        print(f"   ├─ Sessões ativas totais: {len(all_sessions)}")
-        print(f"   └─ Nossas sessões encontradas: {created_count}")
+        log(f"   ├─ Sessões criadas: {len(sessions)}")
+        log(f"   ├─ Sessões ativas totais: {len(all_sessions)}")
+        log(f"   └─ Nossas sessões encontradas: {created_count}")
 
         return created_count == len(sessions)
 
@@ -196,10 +244,10 @@ class HandlerTestSuite:
         if info.get("error"):
             raise AssertionError(f"Erro ao obter info: {info['error']}")
 
-        print(f"   ├─ Session ID: {info.get('session_id')}")
-        print(f"   ├─ Ativa: {info.get('active')}")
-        print(f"   ├─ System Prompt: {info['config'].get('system_prompt')}")
-        print(f"   └─ Tools: {info['config'].get('allowed_tools')}")
+        log(f"   ├─ Session ID: {info.get('session_id')}")
+        log(f"   ├─ Ativa: {info.get('active')}")
+        log(f"   ├─ System Prompt: {info['config'].get('system_prompt')}")
+        log(f"   └─ Tools: {info['config'].get('allowed_tools')}")
 
         return info['session_id'] == session_id
 
@@ -224,11 +272,14 @@ class HandlerTestSuite:
             raise AssertionError("Falha ao atualizar config")
 
         # Verifica atualização
-        saved_config = self.handler.session_configs.get(session_id)
+        try:
+            saved_config = self.handler.session_configs[session_id]
+        except KeyError:
+            raise AssertionError("Configuração não foi salva")
 
-        print(f"   ├─ Config atualizada: {success}")
-        print(f"   ├─ Nova temperature: {saved_config.temperature}")
-        print(f"   └─ Novo prompt: {saved_config.system_prompt}")
+        log(f"   ├─ Config atualizada: {success}")
+        log(f"   ├─ Nova temperature: {saved_config.temperature}")
+        log(f"   └─ Novo prompt: {saved_config.system_prompt}")
 
         return saved_config.temperature == 0.3
 
@@ -239,10 +290,10 @@ class HandlerTestSuite:
 
         status = await self.handler.get_pool_status()
 
-        print(f"   ├─ Tamanho do pool: {status['pool_size']}")
-        print(f"   ├─ Conexões saudáveis: {status['healthy_connections']}")
-        print(f"   ├─ Max size: {status['max_size']}")
-        print(f"   └─ Min size: {status['min_size']}")
+        log(f"   ├─ Tamanho do pool: {status['pool_size']}")
+        log(f"   ├─ Conexões saudáveis: {status['healthy_connections']}")
+        log(f"   ├─ Max size: {status['max_size']}")
+        log(f"   └─ Min size: {status['min_size']}")
 
         return isinstance(status, dict) and 'pool_size' in status
 
@@ -262,8 +313,8 @@ class HandlerTestSuite:
         if session_id in self.handler.clients:
             raise AssertionError("Sessão não foi destruída")
 
-        print(f"   ├─ Sessão criada e destruída: {session_id}")
-        print(f"   └─ Verificação: OK")
+        log(f"   ├─ Sessão criada e destruída: {session_id}")
+        log(f"   └─ Verificação: OK")
 
         return True
 
@@ -272,9 +323,9 @@ class HandlerTestSuite:
         # Tenta destruir sessão inexistente
         try:
             await self.handler.destroy_session("non-existent-session")
-            print(f"   ├─ Destruir sessão inexistente: OK (sem erro)")
+            log(f"   ├─ Destruir sessão inexistente: OK (sem erro)")
         except Exception as e:
-            print(f"   ├─ Destruir sessão inexistente: Erro capturado")
+            log(f"   ├─ Destruir sessão inexistente: Erro capturado")
 
         # Tenta obter info de sessão inexistente
         info = await self.handler.get_session_info("non-existent-session")
@@ -282,25 +333,33 @@ class HandlerTestSuite:
         if "error" not in info:
             raise AssertionError("Deveria retornar erro para sessão inexistente")
 
-        print(f"   └─ Info sessão inexistente: {info['error']}")
+        log(f"   └─ Info sessão inexistente: {info['error']}")
 
         return True
 
     async def cleanup_sessions(self):
         """Limpa todas as sessões de teste."""
-        print("\n🧹 Limpando sessões de teste...")
-
-        for session_id in self.session_ids:
-            try:
-                if session_id in self.handler.clients:
-                    await self.handler.destroy_session(session_id)
-                    print(f"   ├─ Removida: {session_id}")
-            except Exception as e:
-                print(f"   ├─ Erro ao remover {session_id}: {e}")
+        lines = ["\n🧹 Limpando sessões de teste..."]
+        if self.stream:
+            print(lines.pop())
+
+        to_remove = [sid for sid in self.session_ids if sid in self.handler.clients]
+        results = await asyncio.gather(
+            *(self.handler.destroy_session(sid) for sid in to_remove),
+            return_exceptions=True
+        )
+        for session_id, result in zip(to_remove, results):
+            if isinstance(result, Exception):
+                lines.append(f"   ├─ Erro ao remover {session_id}: {result}")
+            else:
+                lines.append(f"   ├─ Removida: {session_id}")
 
         # Encerra pool
         await self.handler.shutdown_pool()
-        print(f"   └─ Pool de conexões encerrado")
+        lines.append(f"   └─ Pool de conexões encerrado")
+
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def show_results(self):
         """Exibe resumo dos resultados."""
@@ -308,9 +367,10 @@ class HandlerTestSuite:
         print("📊 RESUMO DOS TESTES")
         print("="*60)
 
-        passed = sum(1 for _, status, _ in self.test_results if status == "PASSOU")
-        failed = sum(1 for _, status, _ in self.test_results if status == "FALHOU")
-        errors = sum(1 for _, status, _ in self.test_results if status == "ERRO")
+        counts = Counter(status for _, status, _ in self.test_results)
+        passed = counts["PASSOU"]
+        failed = counts["FALHOU"]
+        errors = counts["ERRO"]
         total = len(self.test_results)
 
         print(f"\n✅ Passou: {passed}/{total}")
@@ -333,7 +393,12 @@ class HandlerTestSuite:
 
 async def main():
     """Função principal."""
-    test_suite = HandlerTestSuite()
+    parser = argparse.ArgumentParser(description="Testa o ClaudeHandler")
+    parser.add_argument("--stream", action="store_true",
+                        help="imprime a saída de cada teste na hora (depuração)")
+    args = parser.parse_args()
+
+    test_suite = HandlerTestSuite(stream=args.stream)
 
     try:
         await test_suite.run_all_tests()
@@ -343,7 +408,6 @@ async def main():
         return 1
     except Exception as e:
         print(f"\n❌ Erro fatal nos testes: {e}")
-        import traceback
         traceback.print_exc()
         await test_suite.cleanup_sessions()
         return 1
@@ -352,5 +416,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
-    sys.exit(exit_code)
\ No newline at end of file
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    sys.exit(run(main()))
\ No newline at end of file
@@ -3,6 +3,7 @@
 Teste de conexão com Neo4j
 """
 
+import atexit
 import os
 import sys
 from dotenv import load_dotenv
@@ -13,6 +14,51 @@ load_dotenv()
 # Adiciona o diretório pai ao path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+STATS_QUERY = """
+    CALL { MATCH (n:Learning) RETURN count(n) AS total }
+    OPTIONAL MATCH (n:Learning)
+    WITH total, n
+    ORDER BY n.timestamp DESC
+    LIMIT 3
+    RETURN total, collect(n {
+        .title,
+        content: substring(n.content, 0, 50),
+        truncated: size(n.content) > 50
+    }) AS recent
+"""
+
+_driver = None
+
+def format_memories(memories):
+    """Formata a lista de memórias em um único bloco de texto (uma escrita só)."""
+    lines = []
+    for i, memory in enumerate(memories, 1):
+        lines.append(f"  {i}. {memory.get('title') or 'Sem título'}")
+        content = memory.get("content")
+        if content:
+            lines.append(f"     {content}..." if memory.get("truncated") else f"     {content}")
+    return "\n".join(lines)
+
+def get_driver(uri, user, password):
+    """Retorna o driver compartilhado, criando-o (com pool) na primeira chamada.
+
+    Verificações seguintes no mesmo processo reaproveitam as conexões Bolt
+    do pool; o driver é fechado no atexit.
+    """
+    global _driver
+    if _driver is None:
+        from neo4j import GraphDatabase
+
+        _driver = GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=10,
+            connection_acquisition_timeout=5.0,
+            max_connection_lifetime=3600
+        )
+        atexit.register(_driver.close)
+    return _driver
+
 def test_neo4j_connection():
     """Testa a conexão com Neo4j."""
 
@@ -36,55 +82,29 @@ def test_neo4j_connection():
         return False
 
     try:
-        from neo4j import GraphDatabase
-
         print("📡 Conectando ao Neo4j...")
 
-        # Tenta conectar
-        driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        # Tenta conectar (driver com pool, compartilhado entre verificações)
+        driver = get_driver(neo4j_uri, neo4j_user, neo4j_password)
 
-        # Testa a conexão
+        # Contagem + últimas memórias em uma única ida ao servidor; o
+        # conteúdo já vem truncado. Qualquer query bem-sucedida prova a conexão
         with driver.session() as session:
-            result = session.run("RETURN 1 AS test")
-            record = result.single()
-
-            if record and record["test"] == 1:
-                print("✅ Conexão bem-sucedida!")
-
-                # Conta nós Learning
-                result = session.run("""
-                    MATCH (n:Learning)
-                    RETURN count(n) as total
-                """)
-                count_record = result.single()
-                count = count_record["total"] if count_record else 0
-                print(f"\n📊 Estatísticas:")
-                print(f"  Total de nós Learning: {count}")
-
-                # Lista alguns nós recentes
-                result = session.run("""
-                    MATCH (n:Learning)
-                    RETURN n.title AS title, n.content AS content, n.timestamp AS timestamp
-                    ORDER BY n.timestamp DESC
-                    LIMIT 3
-                """)
-
-                print(f"\n📝 Últimas memórias:")
-                records = list(result)
-                if records:
-                    for i, record in enumerate(records, 1):
-                        title = record.get("title", "Sem título")
-                        content = record.get("content", "")
-                        if content and len(content) > 50:
-                            content = content[:50] + "..."
-                        print(f"  {i}. {title}")
-                        if content:
-                            print(f"     {content}")
-                else:
-                    print("  Nenhuma memória encontrada ainda.")
-
-                driver.close()
-                return True
+            record = session.run(STATS_QUERY).single()
+
+        print("✅ Conexão bem-sucedida!")
+
+        print(f"\n📊 Estatísticas:")
+        print(f"  Total de nós Learning: {record['total']}")
+
+        print(f"\n📝 Últimas memórias:")
+        recent = record["recent"]
+        if recent:
+            print(format_memories(recent))
+        else:
+            print("  Nenhuma memória encontrada ainda.")
+
+        return True
 
     except ImportError:
         print("❌ Biblioteca neo4j não instalada!")
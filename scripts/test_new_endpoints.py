@@ -5,27 +5,94 @@ Script de Teste para Novos Endpoints da API
 Testa funcionalidades de análise de grafos, métricas e analytics
 """
 
-import requests
+import argparse
+import asyncio
+import importlib.util
 import json
+import statistics
+import sys
 import time
-from typing import Dict, Any
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 
+import httpx
+
+
+SEPARATOR = "=" * 60
+BANNER = f"\n{SEPARATOR}"
+
+# (título, [(método, endpoint[, status esperado, body, params])])
+CATEGORIES = (
+    ("📋 CATEGORIA: HEALTH CHECKS", (
+        ("GET", "/api/health"),
+        ("GET", "/api/v1/health/detailed"),
+    )),
+    ("📊 CATEGORIA: ANÁLISE DE GRAFOS", (
+        ("GET", "/api/v1/graph/statistics"),
+        ("GET", "/api/v1/graph/optimize"),
+    )),
+    ("📈 CATEGORIA: MÉTRICAS E MONITORAMENTO", (
+        ("GET", "/api/v1/metrics/overview"),
+        ("GET", "/api/v1/metrics/recent-requests", 200, None, {"limit": 10}),
+    )),
+    ("🔍 CATEGORIA: ANALYTICS DE QUERIES", (
+        ("GET", "/api/v1/analytics/queries/statistics"),
+        ("GET", "/api/v1/analytics/queries/slow"),
+        ("GET", "/api/v1/analytics/queries/recommendations"),
+    )),
+)
+NEGATIVE_ENDPOINT = "/api/v1/nonexistent"
+
+# Mensagens por tipo de erro (isinstance, na ordem do dict: timeouts do httpx
+# também são TransportError, então precisam vir antes)
+ERROR_MESSAGES = {
+    httpx.TimeoutException: ("❌ Timeout ao conectar com {url}",),
+    httpx.TransportError: (
+        "❌ Erro de conexão com {url}",
+        "⚠️  Certifique-se de que o servidor está rodando!",
+    ),
+}
+UNEXPECTED_ERROR_MESSAGES = ("❌ Erro inesperado: {error}",)
+
+# Bytes do corpo lidos por resposta (o suficiente para o preview do log)
+BODY_PREVIEW_BYTES = 4096
+
 
 class APITester:
     """Classe para testar endpoints da API."""
 
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(self, base_url: str = "http://localhost:8080", compact: Optional[bool] = None):
         """
         Inicializa tester.
 
         Args:
             base_url: URL base da API
+            compact: Exibe JSON compacto em vez de indentado (padrão: quando
+                o stdout não é um terminal, ex.: log de CI)
         """
         self.base_url = base_url
+        self.compact = not sys.stdout.isatty() if compact is None else compact
         self.results = []
-
-    def test_endpoint(
+        self._client = None
+
+    async def __aenter__(self):
+        # Um único cliente para todos os testes; com `h2` instalado as
+        # requisições paralelas são multiplexadas numa só conexão HTTP/2
+        # (servidores só HTTP/1.1 continuam funcionando)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=20),
+            timeout=10.0,
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    async def test_endpoint(
         self,
         method: str,
         endpoint: str,
@@ -46,117 +113,155 @@ class APITester:
         Returns:
             True se teste passou
         """
-        url = f"{self.base_url}{endpoint}"
+        passed, log, record = await self._check_endpoint(
+            method, endpoint, expected_status, data, params
+        )
+        self._report(log, record)
+        return passed
 
-        print(f"\n{'='*60}")
-        print(f"🧪 Testando: {method} {endpoint}")
-        print(f"{'='*60}")
+    async def test_category(self, specs: Sequence[Tuple]) -> List[bool]:
+        """
+        Testa endpoints independentes em paralelo.
 
-        try:
-            start = time.time()
+        A saída e os resultados são registrados na ordem de `specs`, não na
+        ordem em que as respostas chegam; o tempo de cada teste é medido
+        dentro da própria corrotina.
+        """
+        outcomes = await asyncio.gather(
+            *(self._check_endpoint(*spec) for spec in specs)
+        )
+        for _, log, record in outcomes:
+            self._report(log, record)
+        return [passed for passed, _, _ in outcomes]
+
+    def _report(self, log: List[str], record: Optional[Dict[str, Any]]):
+        """Imprime o log de um teste e registra o resultado."""
+        print("\n".join(log))
+        if record is not None:
+            self.results.append(record)
+
+    async def _check_endpoint(
+        self,
+        method: str,
+        endpoint: str,
+        expected_status: int = 200,
+        data: Dict[str, Any] = None,
+        params: Dict[str, Any] = None
+    ) -> Tuple[bool, List[str], Optional[Dict[str, Any]]]:
+        """Executa a requisição e retorna (passou, linhas de log, resultado)."""
+        log = []
+        out = log.append
 
-            if method == "GET":
-                response = requests.get(url, params=params, timeout=10)
-            elif method == "POST":
-                response = requests.post(url, json=data, timeout=10)
-            else:
-                print(f"❌ Método não suportado: {method}")
-                return False
+        out(BANNER)
+        out(f"🧪 Testando: {method} {endpoint}")
+        out(SEPARATOR)
 
-            duration = (time.time() - start) * 1000
+        try:
+            start = time.perf_counter_ns()
+
+            if method not in ("GET", "POST"):
+                out(f"❌ Método não suportado: {method}")
+                return False, log, None
+
+            async with self._client.stream(
+                method,
+                endpoint,
+                params=params,
+                json=data
+            ) as response:
+                status_code = response.status_code
+
+                # Lê só o início do corpo; o log mostra no máximo 15 linhas
+                head = bytearray()
+                async for chunk in response.aiter_bytes():
+                    head.extend(chunk)
+                    if len(head) > BODY_PREVIEW_BYTES:
+                        break
+                truncated = len(head) > BODY_PREVIEW_BYTES
+
+            duration = (time.perf_counter_ns() - start) / 1e6
 
             # Verifica status code
-            status_ok = response.status_code == expected_status
+            status_ok = status_code == expected_status
 
             if status_ok:
-                print(f"✅ Status: {response.status_code} (esperado: {expected_status})")
+                out(f"✅ Status: {status_code} (esperado: {expected_status})")
             else:
-                print(f"❌ Status: {response.status_code} (esperado: {expected_status})")
-
-            # Tenta parsear JSON
-            try:
-                json_data = response.json()
-                print(f"📊 Resposta JSON válida")
-
-                # Mostra primeiras linhas
-                pretty_json = json.dumps(json_data, indent=2, ensure_ascii=False)
-                lines = pretty_json.split('\n')[:15]
-                print('\n'.join(lines))
-                if len(pretty_json.split('\n')) > 15:
-                    print("... (truncado)")
-
-            except Exception as e:
-                print(f"⚠️  Resposta não é JSON: {e}")
-                print(f"Body: {response.text[:200]}")
-
-            print(f"⏱️  Tempo de resposta: {duration:.2f}ms")
+                out(f"❌ Status: {status_code} (esperado: {expected_status})")
 
-            # Registra resultado
-            self.results.append({
+            # Respostas pequenas são parseadas; as grandes só têm o início exibido
+            if truncated:
+                out(f"📊 Resposta maior que {BODY_PREVIEW_BYTES} bytes (início)")
+                out(head[:500].decode("utf-8", errors="replace"))
+                out("... (truncado)")
+            else:
+                try:
+                    json_data = json.loads(head)
+                    out(f"📊 Resposta JSON válida")
+
+                    if self.compact:
+                        out(repr(json_data)[:500])
+                    else:
+                        # Mostra primeiras linhas
+                        pretty_json = json.dumps(json_data, indent=2, ensure_ascii=False)
+                        lines = pretty_json.split('\n')
+                        log.extend(lines[:15])
+                        if len(lines) > 15:
+                            out("... (truncado)")
+
+                except Exception as e:
+                    out(f"⚠️  Resposta não é JSON: {e}")
+                    out(f"Body: {head[:200].decode('utf-8', errors='replace')}")
+
+            out(f"⏱️  Tempo de resposta: {duration:.2f}ms")
+
+            record = {
                 "endpoint": endpoint,
                 "method": method,
-                "status": response.status_code,
+                "status": status_code,
                 "expected_status": expected_status,
                 "passed": status_ok,
                 "duration_ms": duration,
                 "timestamp": datetime.now().isoformat()
-            })
+            }
 
-            return status_ok
+            return status_ok, log, record
 
-        except requests.exceptions.Timeout:
-            print(f"❌ Timeout ao conectar com {url}")
-            return False
-        except requests.exceptions.ConnectionError:
-            print(f"❌ Erro de conexão com {url}")
-            print("⚠️  Certifique-se de que o servidor está rodando!")
-            return False
         except Exception as e:
-            print(f"❌ Erro inesperado: {e}")
-            return False
-
-    def run_all_tests(self):
+            messages = next(
+                (msgs for exc_type, msgs in ERROR_MESSAGES.items() if isinstance(e, exc_type)),
+                UNEXPECTED_ERROR_MESSAGES
+            )
+            url = self.base_url + endpoint
+            log.extend(msg.format(url=url, error=e) for msg in messages)
+            return False, log, None
+
+    async def run_all_tests(self):
         """Executa todos os testes."""
-        print("\n" + "="*60)
+        print(BANNER)
         print("🚀 INICIANDO TESTES DA API NEO4J AGENT")
-        print("="*60)
-
-        # 1. Health check básico
-        print("\n\n📋 CATEGORIA: HEALTH CHECKS")
-        self.test_endpoint("GET", "/api/health")
-        self.test_endpoint("GET", "/api/v1/health/detailed")
-
-        # 2. Testes de análise de grafos
-        print("\n\n📊 CATEGORIA: ANÁLISE DE GRAFOS")
-        self.test_endpoint("GET", "/api/v1/graph/statistics")
-        self.test_endpoint("GET", "/api/v1/graph/optimize")
-
-        # 3. Testes de métricas
-        print("\n\n📈 CATEGORIA: MÉTRICAS E MONITORAMENTO")
-        self.test_endpoint("GET", "/api/v1/metrics/overview")
-        self.test_endpoint("GET", "/api/v1/metrics/recent-requests", params={"limit": 10})
-
-        # 4. Testes de analytics
-        print("\n\n🔍 CATEGORIA: ANALYTICS DE QUERIES")
-        self.test_endpoint("GET", "/api/v1/analytics/queries/statistics")
-        self.test_endpoint("GET", "/api/v1/analytics/queries/slow")
-        self.test_endpoint("GET", "/api/v1/analytics/queries/recommendations")
-
-        # 5. Teste de endpoint que não existe (deve retornar 404)
+        print(SEPARATOR)
+
+        # Categorias independentes rodam em paralelo
+        for title, specs in CATEGORIES:
+            print(f"\n\n{title}")
+            await self.test_category(specs)
+
+        # Teste de endpoint que não existe (deve retornar 404), isolado
         print("\n\n🚫 CATEGORIA: TESTES NEGATIVOS")
-        self.test_endpoint("GET", "/api/v1/nonexistent", expected_status=404)
+        await self.test_endpoint("GET", NEGATIVE_ENDPOINT, expected_status=404)
 
         # Resumo dos resultados
         self.print_summary()
 
     def print_summary(self):
         """Imprime resumo dos testes."""
-        print("\n\n" + "="*60)
+        print("\n" + BANNER)
         print("📊 RESUMO DOS TESTES")
-        print("="*60)
+        print(SEPARATOR)
 
         total = len(self.results)
-        passed = sum(1 for r in self.results if r["passed"])
+        passed = Counter(r["passed"] for r in self.results)[True]
         failed = total - passed
 
         print(f"\nTotal de testes: {total}")
@@ -181,6 +286,10 @@ class APITester:
             print(f"  - Tempo médio: {avg_duration:.2f}ms")
             print(f"  - Mais rápido: {min_duration:.2f}ms")
             print(f"  - Mais lento: {max_duration:.2f}ms")
+            print(f"  - Mediana: {statistics.median(durations):.2f}ms")
+            if len(durations) >= 2:
+                p95 = statistics.quantiles(durations, n=20, method="inclusive")[18]
+                print(f"  - p95: {p95:.2f}ms")
 
         # Taxa de sucesso
         success_rate = (passed / total * 100) if total > 0 else 0
@@ -193,23 +302,28 @@ class APITester:
         else:
             print("\n⚠️  Muitos testes falharam - revisar implementação")
 
-        print("\n" + "="*60)
+        print(BANNER)
 
 
-def main():
+async def main():
     """Função principal."""
     # Permite especificar URL base via argumento
-    import sys
-
-    base_url = "http://localhost:8080"
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Testa os endpoints da API")
+    parser.add_argument("base_url", nargs="?", default="http://localhost:8080")
+    parser.add_argument("--quiet", action="store_true",
+                        help="JSON compacto mesmo em terminal")
+    args = parser.parse_args()
 
-    print(f"🌐 Testando API em: {base_url}")
+    print(f"🌐 Testando API em: {args.base_url}")
 
-    tester = APITester(base_url)
-    tester.run_all_tests()
+    async with APITester(args.base_url, compact=True if args.quiet else None) as tester:
+        await tester.run_all_tests()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    run(main())
\ No newline at end of file
@@ -4,28 +4,130 @@ Script de teste para validação de segurança
 Testa todos os tipos de ataques e validações implementados
 """
 
-import requests
+import asyncio
 import json
+import sys
 import time
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+# Payloads por categoria, montados uma vez no import
+XSS_PAYLOADS: Tuple[str, ...] = (
+    "<script>alert('XSS')</script>",
+    "<img src=x onerror=alert('XSS')>",
+    "<iframe src='javascript:alert(1)'>",
+    "javascript:alert('XSS')",
+    "<svg onload=alert('XSS')>",
+    "<body onload=alert('XSS')>",
+)
+
+SQL_PAYLOADS: Tuple[str, ...] = (
+    "' OR '1'='1' --",
+    "1; DROP TABLE users--",
+    "' UNION SELECT * FROM users--",
+    "admin'--",
+    "1' OR '1' = '1'/*",
+)
+
+CMD_PAYLOADS: Tuple[str, ...] = (
+    "; ls -la",
+    "| cat /etc/passwd",
+    "`whoami`",
+    "$(rm -rf /)",
+    "&& ping -c 10 google.com",
+)
+
+PATH_PAYLOADS: Tuple[str, ...] = (
+    "../../etc/passwd",
+    "../../../windows/system32/",
+    "..\\..\\..\\windows\\system32",
+    "%2e%2e%2f%2e%2e%2f",
+    "....//....//",
+)
+
+NOSQL_PAYLOADS: Tuple[str, ...] = (
+    '{"$ne": null}',
+    '{"$gt": ""}',
+    '{"$where": "this.password"}',
+    '{"$regex": ".*"}',
+    '{"$or": [{"a":1}]}',
+)
+
+INVALID_UUIDS: Tuple[str, ...] = (
+    "not-a-uuid",
+    "12345",
+    "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx",
+    "'; DROP TABLE sessions--",
+    "<script>alert('xss')</script>",
+)
+
+LONG_ADDRESS = "0x" + "a" * 100
+INVALID_ADDRESSES: Tuple[str, ...] = (
+    "not-an-address",
+    "0xZZZZ",
+    "<script>alert('xss')</script>",
+    "'; DROP TABLE--",
+    LONG_ADDRESS,  # Muito longo
+)
+
+# Corpo já serializado da mensagem acima do limite (> 50.000 caracteres),
+# enviado como bytes sem passar pelo json.dumps do cliente a cada execução
+LONG_MESSAGE_BODY = json.dumps({"message": "A" * 50001}).encode()
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Instruções exibidas no lugar do teste de rate limiting
+RATE_LIMIT_NOTE = (
+    "⚠️  Teste de rate limiting desabilitado para não sobrecarregar o servidor",
+    "Para testar, execute o seguinte comando:",
+    "  for i in {1..61}; do curl -X POST http://localhost:8080/api/chat -H 'Content-Type: application/json' -d '{\"message\":\"test\"}'; done",
+)
+
+# Headers que /api/health deve retornar
+SECURITY_HEADERS: Tuple[str, ...] = (
+    "X-Content-Type-Options",
+    "X-Frame-Options",
+    "X-XSS-Protection",
+    "Strict-Transport-Security",
+    "Content-Security-Policy",
+    "Referrer-Policy",
+    "Permissions-Policy",
+)
+
+
+def emit(lines: List[str]):
+    """Escreve as linhas de uma seção numa só escrita no stdout"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def create_client(base_url: str) -> httpx.AsyncClient:
+    """Cliente keep-alive usado na checagem inicial e em todos os payloads"""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=5,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
 
 
 class SecurityTester:
     """Classe para testar segurança da API"""
 
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(self, base_url: str = "http://localhost:8080", client: Optional[httpx.AsyncClient] = None):
         self.base_url = base_url
+        self.client = client  # Sem cliente externo, run_tests_async abre um próprio
         self.results: List[Dict] = []
 
-    def test_endpoint(self, method: str, endpoint: str, payload: Dict = None, expected_status: int = 200) -> Tuple[bool, str]:
-        """Testa um endpoint com payload específico"""
-        url = f"{self.base_url}{endpoint}"
-
+    async def _probe(self, client: httpx.AsyncClient, method: str, endpoint: str, payload: Dict = None, expected_status: int = 200,
+                     raw_body: Optional[bytes] = None) -> Tuple[bool, str]:
+        """Testa um endpoint com payload específico (ou `raw_body` já em JSON)"""
         try:
-            if method == "POST":
-                response = requests.post(url, json=payload, timeout=5)
+            if method == "POST" and raw_body is not None:
+                response = await client.post(endpoint, content=raw_body, headers=JSON_HEADERS)
+            elif method == "POST":
+                response = await client.post(endpoint, json=payload)
             elif method == "GET":
-                response = requests.get(url, timeout=5)
+                response = await client.get(endpoint)
             else:
                 return False, f"Método {method} não suportado"
 
@@ -41,287 +143,150 @@ class SecurityTester:
 
             return success, message
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return False, f"Erro de conexão: {str(e)}"
 
-    def run_tests(self):
-        """Executa todos os testes de segurança"""
-        print("=" * 70)
-        print("🛡️  TESTE DE SEGURANÇA - NEO4J AGENT")
-        print("=" * 70)
-        print()
-
-        # 1. Teste de XSS
-        print("📋 TESTE 1: XSS (Cross-Site Scripting)")
-        print("-" * 70)
-
-        xss_payloads = [
-            "<script>alert('XSS')</script>",
-            "<img src=x onerror=alert('XSS')>",
-            "<iframe src='javascript:alert(1)'>",
-            "javascript:alert('XSS')",
-            "<svg onload=alert('XSS')>",
-            "<body onload=alert('XSS')>",
-        ]
-
-        for payload in xss_payloads:
-            success, msg = self.test_endpoint(
-                "POST",
-                "/api/chat",
-                {"message": payload},
-                expected_status=200  # Deve aceitar mas sanitizar
-            )
-            status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-            print(f"{status}: {payload[:50]}")
-            self.results.append({
-                "test": "XSS",
-                "payload": payload,
-                "blocked": success
-            })
-
-        print()
-
-        # 2. Teste de SQL Injection
-        print("📋 TESTE 2: SQL Injection")
-        print("-" * 70)
-
-        sql_payloads = [
-            "' OR '1'='1' --",
-            "1; DROP TABLE users--",
-            "' UNION SELECT * FROM users--",
-            "admin'--",
-            "1' OR '1' = '1'/*",
-        ]
-
-        for payload in sql_payloads:
-            success, msg = self.test_endpoint(
-                "POST",
-                "/api/chat",
-                {"message": payload},
-                expected_status=200  # Deve aceitar mas sanitizar
-            )
-            status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-            print(f"{status}: {payload[:50]}")
-            self.results.append({
-                "test": "SQL Injection",
-                "payload": payload,
-                "blocked": success
-            })
-
-        print()
-
-        # 3. Teste de Command Injection
-        print("📋 TESTE 3: Command Injection")
-        print("-" * 70)
-
-        cmd_payloads = [
-            "; ls -la",
-            "| cat /etc/passwd",
-            "`whoami`",
-            "$(rm -rf /)",
-            "&& ping -c 10 google.com",
-        ]
-
-        for payload in cmd_payloads:
-            success, msg = self.test_endpoint(
-                "POST",
-                "/api/chat",
-                {"message": payload},
-                expected_status=200  # Deve aceitar mas sanitizar
-            )
+    async def _sweep(self, client: httpx.AsyncClient, test_name: str, payloads: Sequence[str],
+                     request: Callable[[str], Tuple[str, str, Optional[Dict]]],
+                     expected_status: int, show_message: bool = False) -> Tuple[List[str], List[Dict]]:
+        """Envia todos os payloads de uma categoria em paralelo.
+
+        `request(payload)` retorna (método, endpoint, body) da requisição.
+        Retorna (linhas do relatório, resultados), ambos na ordem da lista.
+        """
+        outcomes = await asyncio.gather(*(
+            self._probe(client, *request(payload), expected_status=expected_status)
+            for payload in payloads
+        ))
+
+        lines = []
+        records = []
+        for payload, (success, msg) in zip(payloads, outcomes):
             status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-            print(f"{status}: {payload[:50]}")
-            self.results.append({
-                "test": "Command Injection",
-                "payload": payload,
-                "blocked": success
-            })
-
-        print()
-
-        # 4. Teste de Path Traversal
-        print("📋 TESTE 4: Path Traversal")
-        print("-" * 70)
-
-        path_payloads = [
-            "../../etc/passwd",
-            "../../../windows/system32/",
-            "..\\..\\..\\windows\\system32",
-            "%2e%2e%2f%2e%2e%2f",
-            "....//....//",
-        ]
-
-        for payload in path_payloads:
-            success, msg = self.test_endpoint(
-                "POST",
-                "/api/chat",
-                {"message": payload},
-                expected_status=200  # Deve aceitar mas sanitizar
-            )
-            status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-            print(f"{status}: {payload[:50]}")
-            self.results.append({
-                "test": "Path Traversal",
-                "payload": payload,
-                "blocked": success
-            })
-
-        print()
-
-        # 5. Teste de NoSQL Injection
-        print("📋 TESTE 5: NoSQL Injection")
-        print("-" * 70)
-
-        nosql_payloads = [
-            '{"$ne": null}',
-            '{"$gt": ""}',
-            '{"$where": "this.password"}',
-            '{"$regex": ".*"}',
-            '{"$or": [{"a":1}]}',
-        ]
-
-        for payload in nosql_payloads:
-            success, msg = self.test_endpoint(
-                "POST",
-                "/api/chat",
-                {"message": payload},
-                expected_status=200  # Deve aceitar mas sanitizar
-            )
-            status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-            print(f"{status}: {payload[:50]}")
-            self.results.append({
-                "test": "NoSQL Injection",
+            if show_message:
+                lines.append(f"{status}: {payload[:50]} - {msg}")
+            else:
+                lines.append(f"{status}: {payload[:50]}")
+            records.append({
+                "test": test_name,
                 "payload": payload,
                 "blocked": success
             })
+        return lines, records
 
-        print()
-
-        # 6. Teste de Validação de UUID
-        print("📋 TESTE 6: Validação de Session ID (UUID)")
-        print("-" * 70)
-
-        invalid_uuids = [
-            "not-a-uuid",
-            "12345",
-            "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx",
-            "'; DROP TABLE sessions--",
-            "<script>alert('xss')</script>",
-        ]
-
-        for uuid in invalid_uuids:
-            success, msg = self.test_endpoint(
-                "POST",
-                "/api/chat",
-                {"message": "test", "session_id": uuid},
-                expected_status=400  # Deve rejeitar
-            )
-            status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-            print(f"{status}: {uuid[:50]} - {msg}")
-            self.results.append({
-                "test": "UUID Validation",
-                "payload": uuid,
-                "blocked": success
-            })
-
-        print()
-
-        # 7. Teste de Validação de Endereço
-        print("📋 TESTE 7: Validação de Endereço Blockchain")
-        print("-" * 70)
-
-        invalid_addresses = [
-            "not-an-address",
-            "0xZZZZ",
-            "<script>alert('xss')</script>",
-            "'; DROP TABLE--",
-            "0x" + "a" * 100,  # Muito longo
-        ]
-
-        for address in invalid_addresses:
-            success, msg = self.test_endpoint(
-                "GET",
-                f"/api/flow/balance/{address}",
-                expected_status=400  # Deve rejeitar
-            )
-            status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-            print(f"{status}: {address[:50]} - {msg}")
-            self.results.append({
-                "test": "Address Validation",
-                "payload": address,
-                "blocked": success
-            })
-
-        print()
-
-        # 8. Teste de Rate Limiting (comentado para não sobrecarregar)
-        print("📋 TESTE 8: Rate Limiting")
-        print("-" * 70)
-        print("⚠️  Teste de rate limiting desabilitado para não sobrecarregar o servidor")
-        print("Para testar, execute o seguinte comando:")
-        print("  for i in {1..61}; do curl -X POST http://localhost:8080/api/chat -H 'Content-Type: application/json' -d '{\"message\":\"test\"}'; done")
-        print()
-
-        # 9. Teste de Tamanho Máximo
-        print("📋 TESTE 9: Validação de Tamanho Máximo")
-        print("-" * 70)
-
-        # Mensagem muito longa (> 50.000 caracteres)
-        long_message = "A" * 50001
-        success, msg = self.test_endpoint(
+    async def _test_max_length(self, client: httpx.AsyncClient) -> Tuple[List[str], List[Dict]]:
+        """Mensagem muito longa (> 50.000 caracteres) deve ser rejeitada"""
+        success, msg = await self._probe(
+            client,
             "POST",
             "/api/chat",
-            {"message": long_message},
+            raw_body=LONG_MESSAGE_BODY,
             expected_status=400  # Deve rejeitar
         )
         status = "✅ BLOQUEADO" if success else "❌ FALHOU"
-        print(f"{status}: Mensagem com 50.001 caracteres - {msg}")
-        self.results.append({
+        return [f"{status}: Mensagem com 50.001 caracteres - {msg}"], [{
             "test": "Max Length",
             "payload": "50001 chars",
             "blocked": success
-        })
-
-        print()
-
-        # 10. Teste de Headers de Segurança
-        print("📋 TESTE 10: Headers de Segurança")
-        print("-" * 70)
+        }]
 
+    async def _test_headers(self, client: httpx.AsyncClient) -> Tuple[List[str], List[Dict]]:
+        """Confere os headers de segurança retornados por /api/health"""
+        lines = []
+        records = []
         try:
-            response = requests.get(f"{self.base_url}/api/health")
-
-            security_headers = [
-                "X-Content-Type-Options",
-                "X-Frame-Options",
-                "X-XSS-Protection",
-                "Strict-Transport-Security",
-                "Content-Security-Policy",
-                "Referrer-Policy",
-                "Permissions-Policy"
-            ]
-
-            for header in security_headers:
-                if header in response.headers:
-                    print(f"✅ {header}: {response.headers[header][:60]}")
-                    self.results.append({
+            response = await client.get("/api/health")
+
+            for header in SECURITY_HEADERS:
+                value = response.headers.get(header)
+                if value:
+                    lines.append(f"✅ {header}: {value[:60]}")
+                    records.append({
                         "test": "Security Headers",
                         "payload": header,
                         "blocked": True
                     })
                 else:
-                    print(f"❌ {header}: NÃO ENCONTRADO")
-                    self.results.append({
+                    lines.append(f"❌ {header}: NÃO ENCONTRADO")
+                    records.append({
                         "test": "Security Headers",
                         "payload": header,
                         "blocked": False
                     })
 
         except Exception as e:
-            print(f"❌ Erro ao verificar headers: {e}")
+            lines.append(f"❌ Erro ao verificar headers: {e}")
+
+        return lines, records
+
+    def run_tests(self):
+        """Executa todos os testes de segurança"""
+        asyncio.run(self.run_tests_async())
+
+    async def run_tests_async(self):
+        """Executa as categorias em paralelo, cada uma com os payloads em paralelo"""
+        if self.client is not None:
+            await self._run_categories(self.client)
+            return
+
+        async with create_client(self.base_url) as client:
+            await self._run_categories(client)
+
+    async def _run_categories(self, client: httpx.AsyncClient):
+        """Roda as 10 categorias de teste com o cliente compartilhado.
 
+        As categorias são independentes e rodam juntas num TaskGroup; cada
+        uma devolve suas linhas e resultados, que são impressos e registrados
+        na ordem das seções depois que todas terminam.
+        """
+        print("=" * 70)
+        print("🛡️  TESTE DE SEGURANÇA - NEO4J AGENT")
+        print("=" * 70)
         print()
 
+        # Categorias 1-5: o payload vai na mensagem do chat, que deve aceitar mas sanitizar
+        def chat_message(payload):
+            return "POST", "/api/chat", {"message": payload}
+
+        sections = (
+            ("📋 TESTE 1: XSS (Cross-Site Scripting)",
+             self._sweep(client, "XSS", XSS_PAYLOADS, chat_message, expected_status=200)),
+            ("📋 TESTE 2: SQL Injection",
+             self._sweep(client, "SQL Injection", SQL_PAYLOADS, chat_message, expected_status=200)),
+            ("📋 TESTE 3: Command Injection",
+             self._sweep(client, "Command Injection", CMD_PAYLOADS, chat_message, expected_status=200)),
+            ("📋 TESTE 4: Path Traversal",
+             self._sweep(client, "Path Traversal", PATH_PAYLOADS, chat_message, expected_status=200)),
+            ("📋 TESTE 5: NoSQL Injection",
+             self._sweep(client, "NoSQL Injection", NOSQL_PAYLOADS, chat_message, expected_status=200)),
+            ("📋 TESTE 6: Validação de Session ID (UUID)",
+             self._sweep(
+                 client, "UUID Validation", INVALID_UUIDS,
+                 lambda uuid: ("POST", "/api/chat", {"message": "test", "session_id": uuid}),
+                 expected_status=400,  # Deve rejeitar
+                 show_message=True
+             )),
+            ("📋 TESTE 7: Validação de Endereço Blockchain",
+             self._sweep(
+                 client, "Address Validation", INVALID_ADDRESSES,
+                 lambda address: ("GET", f"/api/flow/balance/{address}", None),
+                 expected_status=400,  # Deve rejeitar
+                 show_message=True
+             )),
+            # Rate limiting fica desabilitado para não sobrecarregar o servidor
+            ("📋 TESTE 8: Rate Limiting", None),
+            ("📋 TESTE 9: Validação de Tamanho Máximo", self._test_max_length(client)),
+            ("📋 TESTE 10: Headers de Segurança", self._test_headers(client)),
+        )
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(coro) if coro else None for _, coro in sections]
+
+        for (title, _), task in zip(sections, tasks):
+            lines, records = task.result() if task else (RATE_LIMIT_NOTE, [])
+            emit([title, "-" * 70, *lines, ""])
+            self.results.extend(records)
+
         # Resumo
         self.print_summary()
 
@@ -331,8 +296,17 @@ class SecurityTester:
         print("📊 RESUMO DOS TESTES")
         print("=" * 70)
 
-        total = len(self.results)
-        passed = sum(1 for r in self.results if r["blocked"])
+        # Uma passada só: total geral e [total, bloqueados] por tipo de teste
+        total = 0
+        passed = 0
+        by_type: Dict[str, List[int]] = {}
+        for result in self.results:
+            total += 1
+            counts = by_type.setdefault(result["test"], [0, 0])
+            counts[0] += 1
+            if result["blocked"]:
+                passed += 1
+                counts[1] += 1
         failed = total - passed
 
         print(f"Total de testes: {total}")
@@ -340,21 +314,12 @@ class SecurityTester:
         print(f"❌ Falharam: {failed} ({failed/total*100:.1f}%)")
         print()
 
-        # Resumo por tipo de teste
-        test_types = {}
-        for result in self.results:
-            test_type = result["test"]
-            if test_type not in test_types:
-                test_types[test_type] = {"total": 0, "passed": 0}
-            test_types[test_type]["total"] += 1
-            if result["blocked"]:
-                test_types[test_type]["passed"] += 1
-
+        # Resumo por tipo de teste, na ordem em que apareceram
         print("Detalhamento por tipo:")
-        for test_type, counts in test_types.items():
-            percentage = counts["passed"] / counts["total"] * 100
+        for test_type, (type_total, type_passed) in by_type.items():
+            percentage = type_passed / type_total * 100
             status = "✅" if percentage == 100 else "⚠️" if percentage >= 80 else "❌"
-            print(f"{status} {test_type}: {counts['passed']}/{counts['total']} ({percentage:.1f}%)")
+            print(f"{status} {test_type}: {type_passed}/{type_total} ({percentage:.1f}%)")
 
         print()
 
@@ -368,26 +333,32 @@ class SecurityTester:
         print("=" * 70)
 
 
-def main():
-    """Função principal"""
+async def run_security_tests(base_url: str = "http://localhost:8080"):
+    """Checa o servidor e roda os testes na mesma conexão"""
     print()
     print("Verificando se o servidor está online...")
 
-    try:
-        response = requests.get("http://localhost:8080/api/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Servidor online. Iniciando testes...\n")
-        else:
-            print("❌ Servidor retornou erro. Verifique se está rodando.")
+    async with create_client(base_url) as client:
+        try:
+            response = await client.get("/api/health")
+            if response.status_code == 200:
+                print("✅ Servidor online. Iniciando testes...\n")
+            else:
+                print("❌ Servidor retornou erro. Verifique se está rodando.")
+                return
+        except httpx.HTTPError:
+            print("❌ Não foi possível conectar ao servidor.")
+            print("Execute primeiro: python server.py")
             return
-    except requests.exceptions.RequestException:
-        print("❌ Não foi possível conectar ao servidor.")
-        print("Execute primeiro: python server.py")
-        return
-
-    # Executar testes
-    tester = SecurityTester()
-    tester.run_tests()
+
+        # Executar testes
+        tester = SecurityTester(base_url, client=client)
+        await tester.run_tests_async()
+
+
+def main():
+    """Função principal"""
+    asyncio.run(run_security_tests())
 
 
 if __name__ == "__main__":
@@ -1,13 +1,45 @@
 #!/usr/bin/env python3
 """Script para testar funcionalidades de cache e rate limiting"""
 
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import statistics
 import time
 import json
 from datetime import datetime
 
 BASE_URL = "http://localhost:8080"
 
+# Amostras por cenário em test_performance. O servidor aceita 60 req/min por
+# IP (server.py) e cada amostra custa 2 requisições (preparação + GET medido):
+# 2 cenários x 8 = 32, somadas às ~23 dos testes anteriores, cabem na janela
+PERF_ITERATIONS = 8
+
+# Requisições simultâneas em test_rate_limiting
+RATE_LIMIT_BURST = 10
+
+# Sessão keep-alive compartilhada: todas as chamadas vão para o mesmo host.
+# Não repete requisições, para que os 429 e os tempos medidos sejam os reais.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+
+# Sessão só para preparação (popular/invalidar cache em test_performance):
+# um 429 é repetido com backoff (respeitando Retry-After) em vez de deixar o
+# cenário medido pela metade; esgotadas as tentativas, o 429 é devolvido.
+RETRY_ON_429 = Retry(
+    total=3,
+    status_forcelist=(429,),
+    backoff_factor=0.2,
+    respect_retry_after_header=True,
+    allowed_methods=None,  # 429 = não processada, vale também para POST/DELETE
+    raise_on_status=False
+)
+SETUP_SESSION = requests.Session()
+SETUP_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=RETRY_ON_429))
+
 def test_cache():
     """Testa funcionalidades de cache"""
     print("\n🔵 TESTANDO CACHE")
@@ -15,8 +47,8 @@ def test_cache():
 
     # Teste 1: Set no cache
     print("\n1. Adicionando item no cache...")
-    response = requests.post(f"{BASE_URL}/test/cache",
-                            json={"key": "test_key", "value": "test_value", "ttl": 300})
+    response = SESSION.post(f"{BASE_URL}/test/cache",
+                           json={"key": "test_key", "value": "test_value", "ttl": 300})
     print(f"   Status: {response.status_code}")
     if response.status_code == 200:
         print(f"   Resposta: {response.json()}")
@@ -24,7 +56,7 @@ def test_cache():
     # Teste 2: Get do cache (deve retornar do cache)
     print("\n2. Buscando item do cache...")
     start_time = time.time()
-    response = requests.get(f"{BASE_URL}/test/cache/test_key")
+    response = SESSION.get(f"{BASE_URL}/test/cache/test_key")
     elapsed = (time.time() - start_time) * 1000
     print(f"   Status: {response.status_code}")
     print(f"   Tempo: {elapsed:.2f}ms")
@@ -35,29 +67,35 @@ def test_cache():
 
     # Teste 3: Invalidar cache
     print("\n3. Invalidando cache...")
-    response = requests.delete(f"{BASE_URL}/test/cache/test_key")
+    response = SESSION.delete(f"{BASE_URL}/test/cache/test_key")
     print(f"   Status: {response.status_code}")
 
     # Teste 4: Get após invalidação (deve buscar novamente)
     print("\n4. Buscando após invalidação...")
-    response = requests.get(f"{BASE_URL}/test/cache/test_key")
+    response = SESSION.get(f"{BASE_URL}/test/cache/test_key")
     print(f"   Status: {response.status_code}")
     if response.status_code == 200:
         data = response.json()
         print(f"   Do cache: {data.get('from_cache', False)}")
 
+async def _burst(n):
+    """Dispara `n` requisições simultâneas ao endpoint de rate limit."""
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=n)) as client:
+        return await asyncio.gather(*[client.get(f"{BASE_URL}/test/rate-limit") for _ in range(n)])
+
 def test_rate_limiting():
     """Testa rate limiting"""
     print("\n🔴 TESTANDO RATE LIMITING")
     print("=" * 50)
 
-    # Teste 1: Múltiplas requisições rápidas
-    print("\n1. Fazendo 10 requisições rápidas...")
+    # Teste 1: Rajada de requisições simultâneas (sequenciais com pausa não
+    # chegam a disparar o limite)
+    print(f"\n1. Fazendo {RATE_LIMIT_BURST} requisições simultâneas...")
     success_count = 0
     rate_limited_count = 0
 
-    for i in range(10):
-        response = requests.get(f"{BASE_URL}/test/rate-limit")
+    responses = asyncio.run(_burst(RATE_LIMIT_BURST))
+    for i, response in enumerate(responses):
         if response.status_code == 200:
             success_count += 1
             print(f"   Req {i+1}: ✅ OK")
@@ -66,7 +104,6 @@ def test_rate_limiting():
             print(f"   Req {i+1}: ⛔ Rate limited")
         else:
             print(f"   Req {i+1}: ❌ Erro {response.status_code}")
-        time.sleep(0.1)  # Pequeno delay entre requisições
 
     print(f"\n   Resumo: {success_count} sucesso, {rate_limited_count} bloqueadas")
 
@@ -74,7 +111,7 @@ def test_rate_limiting():
     if rate_limited_count > 0:
         print("\n2. Aguardando 2 segundos para reset do rate limit...")
         time.sleep(2)
-        response = requests.get(f"{BASE_URL}/test/rate-limit")
+        response = SESSION.get(f"{BASE_URL}/test/rate-limit")
         print(f"   Status após espera: {response.status_code}")
         if response.status_code == 200:
             print("   ✅ Rate limit resetado!")
@@ -88,15 +125,15 @@ def test_integration():
 
     # Primeira requisição (não cachada)
     start = time.time()
-    response = requests.post(f"{BASE_URL}/test/integration",
-                            json={"data": "teste integrado"})
+    response = SESSION.post(f"{BASE_URL}/test/integration",
+                           json={"data": "teste integrado"})
     elapsed1 = (time.time() - start) * 1000
     print(f"   Req 1 (sem cache): {elapsed1:.2f}ms - Status: {response.status_code}")
 
     # Segunda requisição (deve vir do cache)
     start = time.time()
-    response = requests.post(f"{BASE_URL}/test/integration",
-                            json={"data": "teste integrado"})
+    response = SESSION.post(f"{BASE_URL}/test/integration",
+                           json={"data": "teste integrado"})
     elapsed2 = (time.time() - start) * 1000
     print(f"   Req 2 (com cache): {elapsed2:.2f}ms - Status: {response.status_code}")
 
@@ -106,50 +143,78 @@ def test_integration():
     # Múltiplas requisições para testar rate limit com cache
     print("\n2. Testando rate limit com cache...")
     for i in range(5):
-        response = requests.post(f"{BASE_URL}/test/integration",
-                                json={"data": f"teste_{i}"})
+        response = SESSION.post(f"{BASE_URL}/test/integration",
+                               json={"data": f"teste_{i}"})
         status = "✅" if response.status_code == 200 else "⛔"
         print(f"   Req {i+1}: {status} Status {response.status_code}")
 
+def summarize_ns(times_ns):
+    """Retorna (mediana, p95, p99) em ms de uma lista de durações em ns."""
+    cuts = statistics.quantiles(times_ns, n=100, method="inclusive")
+    return statistics.median(times_ns) / 1e6, cuts[94] / 1e6, cuts[98] / 1e6
+
+def report_timings(label, times_ns, dropped):
+    """Imprime mediana/p95/p99 das amostras 200 e quantas foram descartadas.
+
+    Respostas 429 (ou outros erros) medem o rate limiter, não o cache, e
+    ficam fora da estatística. Retorna a mediana ou None sem amostras.
+    """
+    if dropped:
+        print(f"   ⛔ {dropped} respostas com status != 200 fora da estatística "
+              f"(429 = PERF_ITERATIONS acima do limite de requisições)")
+    if len(times_ns) < 2:
+        print(f"   ❌ Amostras insuficientes para {label} ({len(times_ns)})")
+        return None
+
+    median, p95, p99 = summarize_ns(times_ns)
+    print(f"   Mediana {label}: {median:.3f}ms (p95 {p95:.3f}ms, p99 {p99:.3f}ms)")
+    return median
+
 def test_performance():
     """Testa performance com e sem cache"""
     print("\n⚡ TESTANDO PERFORMANCE")
     print("=" * 50)
 
     # Teste sem cache
-    print("\n1. Performance SEM cache (10 requisições)...")
+    print(f"\n1. Performance SEM cache ({PERF_ITERATIONS} requisições)...")
     times_no_cache = []
-    for i in range(10):
+    dropped = 0
+    for i in range(PERF_ITERATIONS):
         # Invalidar cache antes
-        requests.delete(f"{BASE_URL}/test/cache/perf_test_{i}")
+        SETUP_SESSION.delete(f"{BASE_URL}/test/cache/perf_test_{i}")
 
-        start = time.time()
-        response = requests.get(f"{BASE_URL}/test/cache/perf_test_{i}")
-        elapsed = (time.time() - start) * 1000
-        times_no_cache.append(elapsed)
+        start = time.perf_counter_ns()
+        response = SESSION.get(f"{BASE_URL}/test/cache/perf_test_{i}")
+        elapsed = time.perf_counter_ns() - start
+        if response.status_code == 200:
+            times_no_cache.append(elapsed)
+        else:
+            dropped += 1
 
-    avg_no_cache = sum(times_no_cache) / len(times_no_cache)
-    print(f"   Tempo médio SEM cache: {avg_no_cache:.2f}ms")
+    median_no_cache = report_timings("SEM cache", times_no_cache, dropped)
 
     # Teste com cache
-    print("\n2. Performance COM cache (10 requisições)...")
+    print(f"\n2. Performance COM cache ({PERF_ITERATIONS} requisições)...")
     times_with_cache = []
-    for i in range(10):
+    dropped = 0
+    for i in range(PERF_ITERATIONS):
         # Primeira requisição para popular o cache
-        requests.post(f"{BASE_URL}/test/cache",
-                     json={"key": f"perf_cached_{i}", "value": f"value_{i}"})
+        SETUP_SESSION.post(f"{BASE_URL}/test/cache",
+                          json={"key": f"perf_cached_{i}", "value": f"value_{i}"})
 
         # Segunda requisição (do cache)
-        start = time.time()
-        response = requests.get(f"{BASE_URL}/test/cache/perf_cached_{i}")
-        elapsed = (time.time() - start) * 1000
-        times_with_cache.append(elapsed)
+        start = time.perf_counter_ns()
+        response = SESSION.get(f"{BASE_URL}/test/cache/perf_cached_{i}")
+        elapsed = time.perf_counter_ns() - start
+        if response.status_code == 200:
+            times_with_cache.append(elapsed)
+        else:
+            dropped += 1
 
-    avg_with_cache = sum(times_with_cache) / len(times_with_cache)
-    print(f"   Tempo médio COM cache: {avg_with_cache:.2f}ms")
+    median_with_cache = report_timings("COM cache", times_with_cache, dropped)
 
-    if avg_with_cache < avg_no_cache:
-        speedup = avg_no_cache / avg_with_cache
+    if median_no_cache and median_with_cache and median_with_cache < median_no_cache:
+        speedup = median_no_cache / median_with_cache
         print(f"\n   🚀 Speedup com cache: {speedup:.2f}x mais rápido!")
 
 def main():
@@ -160,7 +225,7 @@ def main():
 
     try:
         # Verificar se servidor está rodando
-        response = requests.get(f"{BASE_URL}/docs")
+        response = SESSION.get(f"{BASE_URL}/docs")
         print("\n✅ Servidor está rodando na porta 8080")
     except requests.exceptions.ConnectionError:
         print("\n❌ ERRO: Servidor não está rodando na porta 8080")
@@ -4,8 +4,9 @@ Teste com UUID válido
 """
 
 import requests
-import uuid
-import json
+
+from _ids import new_session_id
+from _sse import parse_event
 
 def test_with_valid_uuid():
     """Testa o chat com UUID válido."""
@@ -14,7 +15,7 @@ def test_with_valid_uuid():
     print("=" * 60)
 
     # Gera UUID válido
-    session_id = str(uuid.uuid4())
+    session_id = new_session_id()
     print(f"📋 Session ID válido: {session_id}")
 
     # 1. Cria sessão
@@ -52,26 +53,21 @@ def test_with_valid_uuid():
 
             full_response = []
             for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        try:
-                            data = json.loads(line[6:])
-
-                            if data.get('type') == 'content':
-                                content = data.get('content', '')
-                                full_response.append(content)
-                                print(content, end='', flush=True)
-
-                            elif data.get('type') == 'done':
-                                break
-
-                            elif data.get('type') == 'error':
-                                print(f"\n❌ Erro: {data.get('error', 'Erro desconhecido')}")
-                                break
-
-                        except json.JSONDecodeError:
-                            continue
+                data = parse_event(line)
+                if data is None:
+                    continue
+
+                if data.get('type') == 'content':
+                    content = data.get('content', '')
+                    full_response.append(content)
+                    print(content, end='', flush=True)
+
+                elif data.get('type') == 'done':
+                    break
+
+                elif data.get('type') == 'error':
+                    print(f"\n❌ Erro: {data.get('error', 'Erro desconhecido')}")
+                    break
 
             print("\n" + "-" * 60)
 
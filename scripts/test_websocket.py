@@ -6,19 +6,45 @@ Teste do WebSocket endpoint
 import asyncio
 import websockets
 import json
-import uuid
+from typing import Any
+
+from _ids import new_session_id
+
+# Frames do stream decodificados direto numa struct tipada quando msgspec
+# estiver instalado; sem ele, json.loads + um objeto com os mesmos campos
+try:
+    import msgspec
+
+    class Frame(msgspec.Struct):
+        type: str = ""
+        content: str = ""
+        error: Any = None
+
+    decode_frame = msgspec.json.Decoder(Frame).decode
+except ImportError:
+    from types import SimpleNamespace
+
+    def decode_frame(raw):
+        data = json.loads(raw)
+        return SimpleNamespace(
+            type=data.get("type", ""),
+            content=data.get("content", ""),
+            error=data.get("error")
+        )
 
 async def test_websocket():
     """Testa conexão WebSocket com o servidor."""
 
-    session_id = str(uuid.uuid4())
+    session_id = new_session_id()
     uri = f"ws://localhost:8080/ws/advanced/{session_id}"
 
     print(f"🚀 Conectando ao WebSocket: {uri}")
     print("=" * 60)
 
     try:
-        async with websockets.connect(uri) as websocket:
+        # Frames do chat são pequenos: sem permessage-deflate não há contexto
+        # zlib por frame para descomprimir
+        async with websockets.connect(uri, compression=None, max_size=2**20) as websocket:
             print("✅ Conectado com sucesso!")
 
             # Enviar mensagem de teste
@@ -40,21 +66,20 @@ async def test_websocket():
             while True:
                 try:
                     response = await asyncio.wait_for(websocket.recv(), timeout=10.0)
-                    data = json.loads(response)
+                    frame = decode_frame(response)
                     response_count += 1
 
-                    if data.get("type") == "processing":
+                    if frame.type == "processing":
                         print("⏳ Processando...")
-                    elif data.get("type") == "content":
-                        content = data.get("content", "")
-                        full_response.append(content)
-                        print(content, end="", flush=True)
-                    elif data.get("type") == "done":
+                    elif frame.type == "content":
+                        full_response.append(frame.content)
+                        print(frame.content, end="", flush=True)
+                    elif frame.type == "done":
                         print("\n" + "-" * 40)
                         print("✅ Resposta completa!")
                         break
-                    elif data.get("type") == "error":
-                        print(f"\n❌ Erro: {data.get('error')}")
+                    elif frame.type == "error":
+                        print(f"\n❌ Erro: {frame.error}")
                         break
 
                 except asyncio.TimeoutError:
@@ -5,9 +5,9 @@ Demonstração de múltiplas operações concorrentes
 """
 
 import asyncio
+import importlib.util
 import time
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-import aiohttp
+import httpx
 import json
 from typing import List, Dict, Any
 
@@ -17,6 +17,27 @@ class ParallelTester:
     def __init__(self):
         self.results = []
         self.start_time = time.time()
+        self._client = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Cliente HTTP único, criado no primeiro uso.
+
+        Com `h2` instalado, requisições simultâneas ao mesmo host viram
+        streams HTTP/2 numa só conexão TLS; sem ele, HTTP/1.1 keep-alive.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                timeout=5.0
+            )
+        return self._client
+
+    async def close(self):
+        """Fecha o cliente HTTP compartilhado"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def async_operation(self, id: int, delay: float) -> Dict[str, Any]:
         """Operação assíncrona simulada"""
@@ -44,16 +65,17 @@ class ParallelTester:
         print(f"✅ Operação sync {id} concluída em {result['completed_at']:.2f}s")
         return result
 
-    async def fetch_url(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+    async def fetch_url(self, url: str) -> Dict[str, Any]:
         """Busca assíncrona de URL"""
         try:
-            async with session.get(url, timeout=5) as response:
-                return {
-                    "url": url,
-                    "status": response.status,
-                    "size": len(await response.text()),
-                    "completed_at": time.time() - self.start_time
-                }
+            client = await self._get_client()
+            response = await client.get(url)
+            return {
+                "url": url,
+                "status": response.status_code,
+                "size": len(response.text),
+                "completed_at": time.time() - self.start_time
+            }
         except Exception as e:
             return {
                 "url": url,
@@ -79,18 +101,16 @@ class ParallelTester:
         print(f"⏱️ Tempo total: {time.time() - self.start_time:.2f}s")
         return results
 
-    def run_parallel_threads(self):
+    async def run_parallel_threads(self):
         """Executa operações em threads paralelas"""
         print("\n🎯 Teste 2: Operações em Threads Paralelas")
         print("=" * 50)
 
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [
-                executor.submit(self.sync_operation, i, 1.5 - (i * 0.2))
-                for i in range(1, 5)
-            ]
-
-            results = [future.result() for future in futures]
+        # Executor padrão do loop: as threads rodam sem bloquear o event loop
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self.sync_operation, i, 1.5 - (i * 0.2))
+            for i in range(1, 5)
+        ))
 
         print(f"\n📊 Todas as {len(results)} operações em threads completadas!")
         print(f"⏱️ Tempo total: {time.time() - self.start_time:.2f}s")
@@ -101,24 +121,23 @@ class ParallelTester:
         print("\n🎯 Teste 3: Operações Mistas (Async + HTTP + Threads)")
         print("=" * 50)
 
-        async with aiohttp.ClientSession() as session:
-            # Preparar diferentes tipos de tarefas
-            async_tasks = [
-                self.async_operation(100 + i, 0.5)
-                for i in range(3)
-            ]
+        # Preparar diferentes tipos de tarefas
+        async_tasks = [
+            self.async_operation(100 + i, 0.5)
+            for i in range(3)
+        ]
 
-            url_tasks = [
-                self.fetch_url(session, url) for url in [
-                    "https://httpbin.org/delay/1",
-                    "https://httpbin.org/uuid",
-                    "https://httpbin.org/json"
-                ]
+        url_tasks = [
+            self.fetch_url(url) for url in [
+                "https://httpbin.org/delay/1",
+                "https://httpbin.org/uuid",
+                "https://httpbin.org/json"
             ]
+        ]
 
-            # Executar tudo em paralelo
-            all_tasks = async_tasks + url_tasks
-            results = await asyncio.gather(*all_tasks, return_exceptions=True)
+        # Executar tudo em paralelo
+        all_tasks = async_tasks + url_tasks
+        results = await asyncio.gather(*all_tasks, return_exceptions=True)
 
         print(f"\n📊 Todas as {len(results)} operações mistas completadas!")
         print(f"⏱️ Tempo total: {time.time() - self.start_time:.2f}s")
@@ -141,7 +160,7 @@ class ParallelTester:
         self.start_time = time.time()
 
         # Teste 2: Threads
-        thread_results = self.run_parallel_threads()
+        thread_results = await self.run_parallel_threads()
 
         # Reset timer para teste 3
         self.start_time = time.time()
@@ -194,6 +213,9 @@ async def main():
         print(f"\n❌ Erro durante o teste: {e}")
         return 1
 
+    finally:
+        await tester.close()
+
     return 0
 
 if __name__ == "__main__":
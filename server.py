@@ -14,7 +14,7 @@ import os
 import sys
 import json
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 
 # Adicionar paths do SDK
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'sdk'))
@@ -48,29 +48,31 @@ class EnhancedRateLimiter:
     def __init__(self, max_requests: int = 60, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
+        # Timestamps por IP em ordem de chegada: o mais antigo fica à esquerda
+        self.requests = defaultdict(deque)
 
     def check_rate_limit(self, client_ip: str) -> bool:
         now = time.time()
-        # Limpar requisições antigas
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if req_time > now - self.window_seconds
-        ]
+        window = self.requests[client_ip]
+
+        # Limpar requisições antigas (saem pela esquerda, sem recriar a lista)
+        cutoff = now - self.window_seconds
+        while window and window[0] <= cutoff:
+            window.popleft()
 
         # Verificar limite
-        if len(self.requests[client_ip]) >= self.max_requests:
+        if len(window) >= self.max_requests:
             return False
 
         # Adicionar nova requisição
-        self.requests[client_ip].append(now)
+        window.append(now)
         return True
 
     def get_retry_after(self, client_ip: str) -> int:
-        if not self.requests[client_ip]:
+        window = self.requests[client_ip]
+        if not window:
             return 0
-        oldest = min(self.requests[client_ip])
-        retry_after = int(self.window_seconds - (time.time() - oldest))
+        retry_after = int(self.window_seconds - (time.time() - window[0]))
         return max(0, retry_after)
 
 rate_limiter = EnhancedRateLimiter(max_requests=60, window_seconds=60)
@@ -7,12 +7,59 @@ Sistema inteligente para análise e otimização de queries
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import lru_cache
+from bisect import bisect_left, insort
 import re
 import hashlib
 import json
 
 
+# Padrões de normalize_query, compilados uma vez no import
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_LITERAL_RE = re.compile(r"'[^']*'")
+_NUMBER_RE = re.compile(r'\b\d+\b')
+
+
+def _normalize(query: str) -> str:
+    """Troca literais por placeholders e normaliza espaços e caixa."""
+    # Remove espaços extras
+    normalized = _WHITESPACE_RE.sub(' ', query.strip())
+
+    # Substitui valores literais por placeholders
+    normalized = _STRING_LITERAL_RE.sub("'?'", normalized)  # Strings
+    normalized = _NUMBER_RE.sub('?', normalized)  # Números
+
+    return normalized.lower()
+
+
+def _time_bucket(avg_time_ms: float) -> str:
+    """Faixa de tempo médio usada na distribuição de analyze_query_patterns."""
+    if avg_time_ms < 100:
+        return "<100ms"
+    elif avg_time_ms < 500:
+        return "100-500ms"
+    elif avg_time_ms < 1000:
+        return "500ms-1s"
+    elif avg_time_ms < 5000:
+        return "1-5s"
+    return ">5s"
+
+
+@lru_cache(maxsize=4096)
+def _fingerprint(query: str) -> Tuple[str, str]:
+    """
+    Retorna (hash, template) da query.
+
+    Queries repetidas (o caso comum com Cypher parametrizado) viram uma
+    consulta ao cache em vez de regex + hash a cada execução.
+    """
+    normalized = _normalize(query)
+    # Fingerprint para agrupar queries, não hash de segurança; blake2b com
+    # 16 bytes mantém os 32 caracteres hex do MD5 e é mais rápido no CPython
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest(), normalized
+
+
 @dataclass
 class QueryProfile:
     """Perfil de uma query."""
@@ -26,6 +73,11 @@ class QueryProfile:
     last_execution: Optional[datetime] = None
     errors: int = 0
     slow_executions: int = 0
+    # Calculados uma vez na criação (o template não muda depois)
+    has_where: bool = False
+    has_index_hint: bool = False
+    # Faixa de tempo em que as execuções do perfil estão contadas
+    time_bucket: Optional[str] = None
 
 
 @dataclass
@@ -48,8 +100,18 @@ class QueryAnalyzer:
     def __init__(self):
         """Inicializa analisador."""
         self.query_profiles: Dict[str, QueryProfile] = {}
-        self.query_history: List[Dict[str, Any]] = []
         self.max_history_size = 1000
+        # Mantém só as últimas execuções; append descarta a mais antiga
+        self.query_history: deque = deque(maxlen=self.max_history_size)
+        # Execuções por faixa de tempo médio, atualizado a cada registro
+        self._time_buckets: Dict[str, int] = defaultdict(int)
+        # Totais de todas as execuções registradas
+        self._total_executions = 0
+        self._total_time = 0.0
+        # Índices ordenados (mais lentas / mais executadas primeiro) mantidos
+        # a cada registro: chaves (-avg_time, hash) e (-execution_count, hash)
+        self._by_avg: List[Tuple[float, str]] = []
+        self._by_count: List[Tuple[int, str]] = []
 
     def normalize_query(self, query: str) -> str:
         """
@@ -61,14 +123,7 @@ class QueryAnalyzer:
         Returns:
             Query normalizada
         """
-        # Remove espaços extras
-        normalized = re.sub(r'\s+', ' ', query.strip())
-
-        # Substitui valores literais por placeholders
-        normalized = re.sub(r"'[^']*'", "'?'", normalized)  # Strings
-        normalized = re.sub(r'\b\d+\b', '?', normalized)  # Números
-
-        return normalized.lower()
+        return _fingerprint(query)[1]
 
     def get_query_hash(self, query: str) -> str:
         """
@@ -78,10 +133,9 @@ class QueryAnalyzer:
             query: Query a hashear
 
         Returns:
-            Hash MD5 da query
+            Fingerprint blake2b (16 bytes, hex) da query
         """
-        normalized = self.normalize_query(query)
-        return hashlib.md5(normalized.encode()).hexdigest()
+        return _fingerprint(query)[0]
 
     def record_execution(
         self,
@@ -99,17 +153,24 @@ class QueryAnalyzer:
             success: Se execução foi bem-sucedida
             error: Mensagem de erro (se houver)
         """
-        query_hash = self.get_query_hash(query)
-        normalized = self.normalize_query(query)
+        query_hash, normalized = _fingerprint(query)
 
         # Cria ou atualiza perfil
-        if query_hash not in self.query_profiles:
-            self.query_profiles[query_hash] = QueryProfile(
+        profile = self.query_profiles.get(query_hash)
+        if profile is None:
+            profile = self.query_profiles[query_hash] = QueryProfile(
                 query_hash=query_hash,
-                query_template=normalized
+                query_template=normalized,
+                has_where="where" in normalized,  # Template já está em minúsculas
+                has_index_hint="index" in normalized
             )
+        else:
+            # Sai dos índices antes que avg_time/execution_count mudem
+            self._unindex(profile)
+
+        self._total_executions += 1
+        self._total_time += duration_ms
 
-        profile = self.query_profiles[query_hash]
         profile.execution_count += 1
         profile.total_time += duration_ms
         profile.min_time = min(profile.min_time, duration_ms)
@@ -117,6 +178,14 @@ class QueryAnalyzer:
         profile.avg_time = profile.total_time / profile.execution_count
         profile.last_execution = datetime.utcnow()
 
+        # Move as execuções do perfil para a faixa do novo tempo médio
+        if profile.time_bucket is not None:
+            self._time_buckets[profile.time_bucket] -= profile.execution_count - 1
+        profile.time_bucket = _time_bucket(profile.avg_time)
+        self._time_buckets[profile.time_bucket] += profile.execution_count
+
+        self._index(profile)
+
         if not success:
             profile.errors += 1
 
@@ -132,9 +201,15 @@ class QueryAnalyzer:
             "error": error
         })
 
-        # Limita tamanho do histórico
-        if len(self.query_history) > self.max_history_size:
-            self.query_history = self.query_history[-self.max_history_size:]
+    def _index(self, profile: QueryProfile):
+        """Insere o perfil nos índices ordenados."""
+        insort(self._by_avg, (-profile.avg_time, profile.query_hash))
+        insort(self._by_count, (-profile.execution_count, profile.query_hash))
+
+    def _unindex(self, profile: QueryProfile):
+        """Remove o perfil dos índices ordenados (com as chaves atuais)."""
+        del self._by_avg[bisect_left(self._by_avg, (-profile.avg_time, profile.query_hash))]
+        del self._by_count[bisect_left(self._by_count, (-profile.execution_count, profile.query_hash))]
 
     def get_slow_queries(self, threshold_ms: float = None) -> List[QueryProfile]:
         """
@@ -148,13 +223,12 @@ class QueryAnalyzer:
         """
         threshold = threshold_ms or self.SLOW_QUERY_THRESHOLD_MS
 
-        slow_queries = [
-            profile for profile in self.query_profiles.values()
-            if profile.avg_time > threshold
-        ]
-
-        # Ordena por tempo médio (descendente)
-        slow_queries.sort(key=lambda p: p.avg_time, reverse=True)
+        # O índice já está por tempo médio (descendente): para na primeira rápida
+        slow_queries = []
+        for neg_avg_time, query_hash in self._by_avg:
+            if -neg_avg_time <= threshold:
+                break
+            slow_queries.append(self.query_profiles[query_hash])
 
         return slow_queries
 
@@ -168,9 +242,7 @@ class QueryAnalyzer:
         Returns:
             Lista de queries mais executadas
         """
-        profiles = list(self.query_profiles.values())
-        profiles.sort(key=lambda p: p.execution_count, reverse=True)
-        return profiles[:limit]
+        return [self.query_profiles[query_hash] for _, query_hash in self._by_count[:limit]]
 
     def analyze_query_patterns(self) -> Dict[str, Any]:
         """
@@ -182,28 +254,14 @@ class QueryAnalyzer:
         if not self.query_profiles:
             return {"message": "No query data available"}
 
-        total_queries = sum(p.execution_count for p in self.query_profiles.values())
-        total_time = sum(p.total_time for p in self.query_profiles.values())
+        total_queries = self._total_executions
+        total_time = self._total_time
 
         slow_queries = self.get_slow_queries()
-        very_slow_queries = [
-            p for p in self.query_profiles.values()
-            if p.avg_time > self.VERY_SLOW_QUERY_THRESHOLD_MS
-        ]
-
-        # Análise de distribuição de tempo
-        time_buckets = defaultdict(int)
-        for profile in self.query_profiles.values():
-            if profile.avg_time < 100:
-                time_buckets["<100ms"] += profile.execution_count
-            elif profile.avg_time < 500:
-                time_buckets["100-500ms"] += profile.execution_count
-            elif profile.avg_time < 1000:
-                time_buckets["500ms-1s"] += profile.execution_count
-            elif profile.avg_time < 5000:
-                time_buckets["1-5s"] += profile.execution_count
-            else:
-                time_buckets[">5s"] += profile.execution_count
+        very_slow_queries = self.get_slow_queries(self.VERY_SLOW_QUERY_THRESHOLD_MS)
+
+        # Distribuição de tempo (faixas que ficaram vazias não aparecem)
+        time_buckets = {label: count for label, count in self._time_buckets.items() if count}
 
         return {
             "summary": {
@@ -220,7 +278,7 @@ class QueryAnalyzer:
                     if self.query_profiles else 0
                 )
             },
-            "time_distribution": dict(time_buckets),
+            "time_distribution": time_buckets,
             "top_slow_queries": [
                 {
                     "template": p.query_template[:100],
@@ -285,8 +343,7 @@ class QueryAnalyzer:
             # Verifica queries sem índice (heurística baseada em padrões)
             unindexed_patterns = [
                 p for p in self.query_profiles.values()
-                if "where" in p.query_template.lower() and
-                   "index" not in p.query_template.lower()
+                if p.has_where and not p.has_index_hint
             ]
 
             if unindexed_patterns:
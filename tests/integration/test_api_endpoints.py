@@ -67,6 +67,25 @@ class TestAPIEndpoints:
         assert "total" in data
         assert data["total"] >= 3
 
+    async def test_list_sessions_reports_message_count(self, async_client, valid_session_id):
+        """Testa que a listagem lê o contador mantido pelo handler do chat."""
+        from core.claude_handler import claude_handler
+
+        create_response = await async_client.post("/api/sessions", json={
+            "session_id": valid_session_id,
+            "project_id": "test"
+        })
+        assert create_response.status_code == 200
+
+        # O envio de mensagem (send_message) incrementa o contador assim
+        claude_handler.session_manager.record_message(valid_session_id)
+
+        response = await async_client.get("/api/sessions")
+
+        assert response.status_code == 200
+        sessions = {s["session_id"]: s for s in response.json()["sessions"]}
+        assert sessions[valid_session_id]["messages_count"] == 1
+
     async def test_delete_session_success(self, async_client, valid_session_id):
         """Testa deleção bem-sucedida de sessão."""
         # Criar sessão primeiro
@@ -0,0 +1,48 @@
+"""
+Testes de integração para os novos endpoints (grafos, métricas, analytics).
+"""
+
+import pytest
+
+
+# Sem Neo4j as rotas de grafo respondem 500: o HTTPException(503) levantado
+# dentro do try é capturado pelo `except Exception` da própria rota
+NEEDS_NEO4J = pytest.mark.neo4j
+
+
+def _broken(reason):
+    """Rota com defeito conhecido; passa a falhar o teste quando for corrigida."""
+    return pytest.mark.xfail(strict=True, reason=reason)
+
+
+ENDPOINT_CASES = (
+    pytest.param("GET", "/api/health", 200, None, id="health"),
+    pytest.param("GET", "/api/v1/health/detailed", 200, None, id="health-detailed"),
+    pytest.param("GET", "/api/v1/graph/statistics", 200, None,
+                 id="graph-statistics", marks=NEEDS_NEO4J),
+    pytest.param("GET", "/api/v1/graph/optimize", 200, None,
+                 id="graph-optimize", marks=NEEDS_NEO4J),
+    pytest.param("GET", "/api/v1/metrics/overview", 200, None, id="metrics-overview",
+                 marks=_broken("MetricsCollector não tem get_overview()")),
+    pytest.param("GET", "/api/v1/metrics/recent-requests", 200, {"limit": 10},
+                 id="metrics-recent-requests"),
+    pytest.param("GET", "/api/v1/analytics/queries/statistics", 200, None,
+                 id="analytics-statistics"),
+    pytest.param("GET", "/api/v1/analytics/queries/slow", 200, None, id="analytics-slow",
+                 marks=_broken("get_slow_queries() é chamado com 3 argumentos posicionais")),
+    pytest.param("GET", "/api/v1/analytics/queries/recommendations", 200, None,
+                 id="analytics-recommendations",
+                 marks=_broken("QueryAnalyzer não tem get_optimization_recommendations()")),
+    pytest.param("GET", "/api/v1/nonexistent", 404, None, id="not-found"),
+)
+
+
+@pytest.mark.integration
+@pytest.mark.api
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method,endpoint,expected_status,params", ENDPOINT_CASES)
+async def test_endpoint_status(async_client, method, endpoint, expected_status, params):
+    """Cada endpoint responde com o status esperado."""
+    response = await async_client.request(method, endpoint, params=params)
+
+    assert response.status_code == expected_status
@@ -154,6 +154,17 @@ class TestSessionManager:
         assert len(active) == 3
         assert all(sid in active for sid in session_ids)
 
+    def test_record_message_updates_count(self, session_manager, valid_session_id):
+        """Testa contador de mensagens mantido incrementalmente."""
+        session_manager.register_session(valid_session_id)
+
+        for _ in range(3):
+            session_manager.record_message(valid_session_id)
+
+        assert session_manager.get_session_metrics(valid_session_id).message_count == 3
+        active = session_manager.get_active_sessions()
+        assert active[valid_session_id]["message_count"] == 3
+
     def test_create_session(self, session_manager):
         """Testa criação de sessão via método público."""
         session_id = "new-session"
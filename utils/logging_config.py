@@ -4,6 +4,7 @@ Configuração de logging estruturado para API Claude Code SDK.
 Sistema de logging com formatação JSON, rotação automática e níveis apropriados.
 """
 
+import functools
 import logging
 import logging.handlers
 import json
@@ -168,6 +169,38 @@ def setup_logging(
     # Configura loggers específicos
     _configure_specific_loggers()
 
+def setup_script_logging(
+    level: int = logging.INFO,
+    capacity: int = 500,
+    flush_level: int = logging.ERROR
+) -> None:
+    """
+    Configura logging bufferizado para scripts de linha de comando.
+
+    As mensagens saem sem formatação extra (como ``print``), mas são acumuladas
+    em um MemoryHandler e escritas no stdout em lote: quando o buffer enche,
+    quando chega um registro >= ``flush_level`` ou no ``logging.shutdown``
+    executado na saída do processo.
+
+    Args:
+        level: Nível mínimo de log
+        capacity: Quantidade de registros acumulados antes de escrever
+        flush_level: Nível que força a escrita imediata do buffer
+    """
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.setLevel(level)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    root_logger.addHandler(logging.handlers.MemoryHandler(
+        capacity,
+        flushLevel=flush_level,
+        target=console_handler
+    ))
+
 def _configure_specific_loggers():
     """Configura loggers para módulos específicos."""
     
@@ -190,9 +223,13 @@ def _configure_specific_loggers():
     analytics_logger = logging.getLogger("analytics_service")
     analytics_logger.setLevel(logging.INFO)
 
+@functools.lru_cache(maxsize=None)
 def get_contextual_logger(name: str) -> ContextualLogger:
     """
     Obtém logger contextual para um módulo específico.
+
+    O wrapper não guarda estado além do logger, então é criado uma única
+    vez por nome e reaproveitado nas chamadas seguintes.
     
     Args:
         name: Nome do módulo/logger